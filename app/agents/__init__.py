@@ -0,0 +1,32 @@
+import asyncio
+
+# Importing app.agents.graph pulls in LangChain and LangGraph, which takes
+# seconds, so it happens on first use instead of at application start-up
+_agent = None
+_agent_lock = asyncio.Lock()
+
+
+def _create_agent():
+    from app.agents.graph import ResumeModifierAgent
+    return ResumeModifierAgent()
+
+
+async def get_agent():
+    """Return the process-wide ResumeModifierAgent, so its sessions, result
+    cache and in-flight requests are shared by every router. The first call
+    imports and builds it in a worker thread, leaving the event loop free."""
+    global _agent
+    if _agent is None:
+        async with _agent_lock:
+            if _agent is None:
+                _agent = await asyncio.to_thread(_create_agent)
+    return _agent
+
+
+async def prune_agent_disk_cache() -> int:
+    """Expire the agent's on-disk PDF and result caches; returns how many files
+    were removed. Does nothing before the agent exists, so the graph is not
+    imported just to sweep."""
+    if _agent is None:
+        return 0
+    return await asyncio.to_thread(_agent.prune_disk_cache)
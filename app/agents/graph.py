@@ -1,281 +1,69 @@
 import logging
-import re
 import os
-from typing import Dict, Any, List, Optional, TypedDict
-from datetime import datetime
+import hashlib
 import json
-import subprocess
+import shutil
+import sys
+import time
+from collections import OrderedDict
+from functools import lru_cache
+from pathlib import Path
+from typing import AsyncIterator, Dict, Any, List, Optional, TypedDict
+from datetime import datetime
+import asyncio
 import tempfile
+import threading
+import aiofiles
+import pydantic
 import yaml
 
 from langchain_anthropic import ChatAnthropic
+from langchain_core.caches import InMemoryCache
 from langchain_core.messages import HumanMessage, SystemMessage
+from langchain_core.runnables import RunnableConfig
 from langgraph.graph import StateGraph, END
 
+from app.agents.latex_rendercv import latex_to_rendercv
 from app.config import settings
 
+try:
+    # Render in-process when RenderCV is importable; otherwise use its CLI
+    from rendercv import data as _rendercv_data, renderer as _rendercv_renderer
+    from rendercv.api import read_a_yaml_string_and_return_a_data_model as _rendercv_read_yaml
+except ImportError:
+    _rendercv_renderer = None
+
 logger = logging.getLogger(__name__)
 
+# RenderCV keeps module-level state (locale, dates) while validating a
+# document, so in-process renders run one at a time
+_RENDERCV_LOCK = threading.Lock()
 
-class ResumeState(TypedDict):
-    """State object for the resume modifier agent"""
-    session_id: str
-    job_description: str
-    company_name: str
-    position_title: str
-    requirements: Optional[str]
-    original_resume: str
-    modified_resume: str
-    rendercv_yaml: str
-    current_step: str
-    error: Optional[str]
+_MAX_OUTPUT_TOKENS = 10000
 
+# libyaml's C emitter when PyYAML was built with it
+_YAML_DUMPER = getattr(yaml, "CSafeDumper", yaml.SafeDumper)
 
-class ResumeModifierAgent:
-    """
-    Main agent for modifying resumes based on job descriptions using LangGraph
-    """
-    
-    def __init__(self):
-        self.llm = self._initialize_llm()
-        self.graph = self._build_graph()
-        self.sessions = {}  # In-memory session storage (use Redis in production)
-    
-    def _initialize_llm(self):
-        """Initialize the language model - only use Anthropic"""
-        if settings.anthropic_api_key:
-            return ChatAnthropic(
-                model=settings.anthropic_model,
-                api_key=settings.anthropic_api_key,
-                temperature=0.3,
-                max_tokens=10000
-            )
-        else:
-            raise ValueError("Anthropic API key is required for LaTeX modification")
-    
-    def _build_graph(self):
-        """Build the LangGraph workflow"""
-        workflow = StateGraph(ResumeState)
-        
-        # Add nodes
-        workflow.add_node("load_resume", self._load_resume_node)
-        workflow.add_node("modify_content", self._modify_content_node)
-        workflow.add_node("convert_to_rendercv", self._convert_to_rendercv_node)
-        workflow.add_node("format_output", self._format_output_node)
-        
-        # Add edges
-        workflow.set_entry_point("load_resume")
-        workflow.add_edge("load_resume", "modify_content")
-        workflow.add_edge("modify_content", "convert_to_rendercv")
-        workflow.add_edge("convert_to_rendercv", "format_output")
-        workflow.add_edge("format_output", END)
-        
-        return workflow.compile()
-    
-    def _get_venv_python_path(self) -> str:
-        """Get the Python executable path from the current virtual environment"""
-        import sys
-        
-        # First try to use sys.executable (current Python interpreter)
-        if hasattr(sys, 'real_prefix') or (hasattr(sys, 'base_prefix') and sys.base_prefix != sys.prefix):
-            # We're in a virtual environment
-            return sys.executable
-        
-        # Fallback: try to detect .venv directory relative to project root
-        project_root = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))
-        venv_python_paths = [
-            os.path.join(project_root, '.venv', 'bin', 'python'),  # Linux/macOS
-            os.path.join(project_root, '.venv', 'Scripts', 'python.exe'),  # Windows
-            os.path.join(project_root, 'venv', 'bin', 'python'),  # Alternative naming
-            os.path.join(project_root, 'venv', 'Scripts', 'python.exe'),  # Windows alternative
-        ]
-        
-        for python_path in venv_python_paths:
-            if os.path.exists(python_path):
-                return python_path
-        
-        # If no virtual environment is detected, use system Python
-        logger.warning("No virtual environment detected, using system Python")
-        return sys.executable
-    
-    def _get_venv_environment(self) -> dict:
-        """Get environment variables for running subprocess in virtual environment"""
-        import sys
-        
-        # Get current environment
-        env = os.environ.copy()
-        
-        # If we're in a virtual environment, add VIRTUAL_ENV and modify PATH
-        if hasattr(sys, 'real_prefix') or (hasattr(sys, 'base_prefix') and sys.base_prefix != sys.prefix):
-            venv_path = sys.prefix
-            env['VIRTUAL_ENV'] = venv_path
-            
-            # Add virtual environment's bin directory to PATH
-            if os.name == 'nt':  # Windows
-                venv_bin = os.path.join(venv_path, 'Scripts')
-            else:  # Linux/macOS
-                venv_bin = os.path.join(venv_path, 'bin')
-            
-            env['PATH'] = venv_bin + os.pathsep + env.get('PATH', '')
-        
-        return env
+# Scratch directories for PDF builds live in RAM when tmpfs is available
+_TMPFS_DIR = '/dev/shm' if os.path.isdir('/dev/shm') and os.access('/dev/shm', os.W_OK) else None
 
-    def _generate_pdf_with_rendercv_alternative(self, yaml_content: str, output_path: str) -> str:
-        """Alternative method: Generate PDF using RenderCV with environment variables"""
-        try:
-            # Create a temporary directory for RenderCV
-            with tempfile.TemporaryDirectory() as temp_dir:
-                # Write YAML content to temporary file
-                yaml_file = os.path.join(temp_dir, "resume.yaml")
-                with open(yaml_file, 'w', encoding='utf-8') as f:
-                    f.write(yaml_content)
-                
-                # Generate a temporary PDF path
-                temp_pdf_path = os.path.join(temp_dir, "output.pdf")
-                
-                # Get virtual environment
-                env = self._get_venv_environment()
-                
-                # Use RenderCV to generate PDF with proper environment
-                result = subprocess.run(
-                    ['rendercv', 'render', yaml_file, '--pdf-path', temp_pdf_path],
-                    capture_output=True,
-                    text=True,
-                    cwd=temp_dir,
-                    env=env  # Use virtual environment
-                )
-                
-                if result.returncode != 0:
-                    logger.error(f"RenderCV failed: {result.stderr}")
-                    raise Exception(f"RenderCV failed: {result.stderr}")
-                
-                # Check if PDF was generated and copy to final output path
-                if os.path.exists(temp_pdf_path):
-                    import shutil
-                    shutil.copy2(temp_pdf_path, output_path)
-                    return output_path
-                else:
-                    raise Exception("PDF file was not generated by RenderCV")
-                    
-        except subprocess.CalledProcessError as e:
-            logger.error(f"RenderCV subprocess error: {str(e)}")
-            raise Exception(f"RenderCV subprocess error: {str(e)}")
-        except Exception as e:
-            logger.error(f"Error generating PDF with RenderCV: {str(e)}")
-            raise Exception(f"Error generating PDF with RenderCV: {str(e)}")
 
-    def _generate_pdf_with_rendercv(self, yaml_content: str, output_path: str) -> str:
-        """Generate PDF using RenderCV"""
-        try:
-            # Create a temporary directory for RenderCV
-            with tempfile.TemporaryDirectory() as temp_dir:
-                # Write YAML content to temporary file
-                yaml_file = os.path.join(temp_dir, "resume.yaml")
-                with open(yaml_file, 'w', encoding='utf-8') as f:
-                    f.write(yaml_content)
-                
-                # Generate a temporary PDF path
-                temp_pdf_path = os.path.join(temp_dir, "output.pdf")
-                
-                # Get the virtual environment's Python executable path
-                venv_python = self._get_venv_python_path()
-                
-                # Use RenderCV to generate PDF with specific output path
-                # Use python -m rendercv to ensure we're using the right environment
-                result = subprocess.run(
-                    [venv_python, '-m', 'rendercv', 'render', yaml_file, '--pdf-path', temp_pdf_path],
-                    capture_output=True,
-                    text=True,
-                    cwd=temp_dir
-                )
-                
-                if result.returncode != 0:
-                    logger.error(f"RenderCV failed: {result.stderr}")
-                    raise Exception(f"RenderCV failed: {result.stderr}")
-                
-                # Check if PDF was generated and copy to final output path
-                if os.path.exists(temp_pdf_path):
-                    import shutil
-                    shutil.copy2(temp_pdf_path, output_path)
-                    return output_path
-                else:
-                    raise Exception("PDF file was not generated by RenderCV")
-                    
-        except subprocess.CalledProcessError as e:
-            logger.error(f"RenderCV subprocess error: {str(e)}")
-            raise Exception(f"RenderCV subprocess error: {str(e)}")
-        except Exception as e:
-            logger.error(f"Error generating PDF with RenderCV: {str(e)}")
-            raise Exception(f"Error generating PDF with RenderCV: {str(e)}")
-    
-    def _compile_latex_to_pdf(self, latex_content: str, output_path: str) -> str:
-        """Compile LaTeX content to PDF"""
-        try:
-            # Create a temporary directory for LaTeX compilation
-            with tempfile.TemporaryDirectory() as temp_dir:
-                # Write LaTeX content to temporary file
-                tex_file = os.path.join(temp_dir, "resume.tex")
-                with open(tex_file, 'w', encoding='utf-8') as f:
-                    f.write(latex_content)
-                
-                # Compile LaTeX to PDF
-                result = subprocess.run(
-                    ['pdflatex', '-interaction=nonstopmode', '-output-directory', temp_dir, tex_file],
-                    capture_output=True,
-                    text=True,
-                    cwd=temp_dir
-                )
-                
-                if result.returncode != 0:
-                    logger.error(f"LaTeX compilation failed: {result.stderr}")
-                    raise Exception(f"LaTeX compilation failed: {result.stderr}")
-                
-                # Copy PDF to output directory
-                pdf_file = os.path.join(temp_dir, "resume.pdf")
-                if os.path.exists(pdf_file):
-                    import shutil
-                    shutil.copy2(pdf_file, output_path)
-                    return output_path
-                else:
-                    raise Exception("PDF file was not generated")
-                    
-        except subprocess.CalledProcessError as e:
-            logger.error(f"LaTeX compilation error: {str(e)}")
-            raise Exception(f"LaTeX compilation error: {str(e)}")
-        except Exception as e:
-            logger.error(f"Error compiling LaTeX: {str(e)}")
-            raise Exception(f"Error compiling LaTeX: {str(e)}")
-    
-    async def _load_resume_node(self, state: ResumeState) -> ResumeState:
-        """Load the current resume content"""
-        try:
-            logger.info(f"Loading resume for session {state['session_id']}")
-            
-            # Load the LaTeX resume
-            resume_path = os.path.join(settings.cv_directory, "main.tex")
-            if os.path.exists(resume_path):
-                with open(resume_path, 'r', encoding='utf-8') as file:
-                    resume_content = file.read()
-                
-                state["original_resume"] = resume_content
-                state["current_step"] = "resume_loaded"
-                logger.info("Resume loaded successfully")
-            else:
-                state["error"] = "Resume file not found"
-                logger.error("Resume file not found")
-                
-        except Exception as e:
-            state["error"] = f"Error loading resume: {str(e)}"
-            logger.error(f"Error loading resume: {str(e)}", exc_info=True)
-            
-        return state
-    
-    async def _modify_content_node(self, state: ResumeState) -> ResumeState:
-        """Modify the resume content based on job description"""
-        try:
-            logger.info(f"Modifying content for session {state['session_id']}")
-            
-            modification_prompt = f"""
+def _is_pdf(path: str) -> bool:
+    """Whether path holds a PDF, judged by its header"""
+    try:
+        with open(path, 'rb') as file:
+            return file.read(5) == b'%PDF-'
+    except FileNotFoundError:
+        return False
+
+# Static prompt content is built once at import; only the request fields
+# are joined in per call. Messages are immutable, so the system
+# messages are shared across every request.
+_MODIFY_SYSTEM_MESSAGE = SystemMessage(content="You are a professional resume optimizer specializing in LaTeX formatting. Modify resumes to match job requirements while maintaining accuracy and professionalism. Never add new information that wasn't in the original resume.")
+
+_CONVERT_SYSTEM_MESSAGE = SystemMessage(content="You are an expert in converting LaTeX resumes to RenderCV YAML format. Ensure accurate extraction of all information while maintaining proper YAML structure.")
+
+_MODIFY_PROMPT_HEAD = """
 Task
 You are a professional resume optimizer. Given a job description and a comprehensive resume, your task is to modify the resume by removing or reducing irrelevant experience points while maintaining the original LaTeX structure and formatting. You must NEVER add new information, skills, or experiences that are not already present in the original resume.
 
@@ -374,41 +162,14 @@ Provide the complete modified LaTeX resume code, ready to compile, with clear co
 
 Now apply this to the following:
 
-Job Description:
-Company: {state['company_name']}
-Position: {state['position_title']}
-Job Description: {state['job_description']}
-Additional Requirements: {state.get('requirements', 'None')}
+"""
 
-Original Resume:
-{state['original_resume']}
+_MODIFY_PROMPT_TAIL = """
 
 Return the complete modified LaTeX document.
-            """
-            
-            messages = [
-                SystemMessage(content="You are a professional resume optimizer specializing in LaTeX formatting. Modify resumes to match job requirements while maintaining accuracy and professionalism. Never add new information that wasn't in the original resume."),
-                HumanMessage(content=modification_prompt)
-            ]
-            
-            response = await self.llm.ainvoke(messages)
-            
-            state["modified_resume"] = response.content
-            state["current_step"] = "content_modified"
-            logger.info("Resume content modification completed")
-            
-        except Exception as e:
-            state["error"] = f"Error modifying content: {str(e)}"
-            logger.error(f"Error modifying content: {str(e)}", exc_info=True)
-            
-        return state
-    
-    async def _convert_to_rendercv_node(self, state: ResumeState) -> ResumeState:
-        """Convert LaTeX resume to RenderCV YAML format"""
-        try:
-            logger.info(f"Converting to RenderCV format for session {state['session_id']}")
-            
-            conversion_prompt = f"""
+"""
+
+_CONVERT_PROMPT_HEAD = """
 Task: Convert a LaTeX resume to RenderCV YAML format.
 
 You are an expert in both LaTeX and RenderCV YAML format. Convert the following LaTeX resume into a properly structured RenderCV YAML file.
@@ -481,13 +242,384 @@ Instructions:
 Note: DO NOT put ```yaml on the content.
 
 LaTeX Resume to Convert:
-{state['modified_resume']}
+"""
+
+_CONVERT_PROMPT_TAIL = """
 
 Return only the complete YAML content for RenderCV, properly formatted and ready to use.
-            """
+"""
+
+
+class ResumeState(TypedDict):
+    """State object for the resume modifier agent"""
+    session_id: str
+    job_description: str
+    company_name: str
+    position_title: str
+    requirements: Optional[str]
+    original_resume: str
+    modified_resume: str
+    rendercv_yaml: str
+    output_stem: str
+    tex_file: Optional[str]
+    current_step: str
+    error: Optional[str]
+
+
+@lru_cache(maxsize=4)
+def _get_llm(model: str, api_key: str) -> ChatAnthropic:
+    """Create the Anthropic chat model once and share it, with its HTTP
+    connection pool and response cache, across agent instances"""
+    return ChatAnthropic(
+        model=model,
+        api_key=api_key,
+        temperature=0.3,
+        max_tokens=_MAX_OUTPUT_TOKENS,
+        # The Anthropic SDK retries 429/5xx/529 with jittered exponential
+        # backoff and honours retry-after before a response starts
+        max_retries=settings.llm_max_retries,
+        # Identical prompts (e.g. converting the same LaTeX twice) skip
+        # the API call. Streaming calls bypass this cache; identical
+        # modification prompts are served by the result cache instead.
+        cache=InMemoryCache(maxsize=settings.llm_cache_size)
+    )
+
+
+def _agent_node(method_name: str):
+    """Wrap an agent node method so the shared graph calls the agent running it"""
+    async def node(state: ResumeState, config: RunnableConfig) -> ResumeState:
+        agent = config["configurable"]["agent"]
+        return await getattr(agent, method_name)(state)
+    return node
+
+
+def _add_step(workflow: StateGraph, source: str, target: str) -> None:
+    """Continue from source to target, ending the run early once a node has failed"""
+    workflow.add_conditional_edges(
+        source,
+        lambda state: END if state.get("error") else target,
+        [target, END]
+    )
+
+
+def _build_graph():
+    """Build the LangGraph workflow"""
+    workflow = StateGraph(ResumeState)
+    
+    # Add nodes
+    workflow.add_node("load_resume", _agent_node("_load_resume_node"))
+    workflow.add_node("modify_content", _agent_node("_modify_content_node"))
+    workflow.add_node("convert_to_rendercv", _agent_node("_convert_to_rendercv_node"))
+    workflow.add_node("format_output", _agent_node("_format_output_node"))
+    
+    # Add edges
+    workflow.set_entry_point("load_resume")
+    _add_step(workflow, "load_resume", "modify_content")
+    _add_step(workflow, "modify_content", "convert_to_rendercv")
+    _add_step(workflow, "convert_to_rendercv", "format_output")
+    workflow.add_edge("format_output", END)
+    
+    return workflow.compile()
+
+
+class ResumeModifierAgent:
+    """
+    Main agent for modifying resumes based on job descriptions using LangGraph
+    """
+    
+    # The topology is static, so the graph is compiled once for all agents;
+    # each run passes the agent in through its config
+    _GRAPH = _build_graph()
+    
+    def __init__(self):
+        self.llm = self._initialize_llm()
+        self.graph = self._GRAPH
+        self._run_config = {"configurable": {"agent": self}}
+        # In-memory LRU session storage with a TTL (use Redis in production)
+        self.sessions: "OrderedDict[str, tuple]" = OrderedDict()  # id -> (expires_at, session data)
+        self._resume_cache: Optional[tuple] = None  # (st_mtime_ns, content) of main.tex
+        self._result_cache: "OrderedDict[str, tuple]" = OrderedDict()  # key -> (result, session data)
+        self._inflight: Dict[str, asyncio.Future] = {}  # key -> future of a running modification
+        # Rendered PDFs keyed by a hash of their YAML; one lock per hash in
+        # flight, dropped once its last user is done
+        self._pdf_cache_dir = os.path.join(settings.output_directory, "_cache")
+        self._render_locks: Dict[str, list] = {}  # digest -> [lock, requests using it]
+        # Finished results also go to disk, so a restart doesn't rerun the LLM
+        self._result_cache_dir = os.path.join(self._pdf_cache_dir, "results")
+        os.makedirs(self._result_cache_dir, exist_ok=True)
+    
+    def _initialize_llm(self):
+        """Initialize the language model - only use Anthropic"""
+        if settings.anthropic_api_key:
+            return _get_llm(settings.anthropic_model, settings.anthropic_api_key)
+        else:
+            raise ValueError("Anthropic API key is required for LaTeX modification")
+    
+    def _get_venv_python_path(self) -> str:
+        """Get the Python executable path from the current virtual environment"""
+        # First try to use sys.executable (current Python interpreter)
+        if hasattr(sys, 'real_prefix') or (hasattr(sys, 'base_prefix') and sys.base_prefix != sys.prefix):
+            # We're in a virtual environment
+            return sys.executable
+        
+        # Fallback: try to detect .venv directory relative to project root
+        project_root = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))
+        venv_python_paths = [
+            os.path.join(project_root, '.venv', 'bin', 'python'),  # Linux/macOS
+            os.path.join(project_root, '.venv', 'Scripts', 'python.exe'),  # Windows
+            os.path.join(project_root, 'venv', 'bin', 'python'),  # Alternative naming
+            os.path.join(project_root, 'venv', 'Scripts', 'python.exe'),  # Windows alternative
+        ]
+        
+        for python_path in venv_python_paths:
+            if os.path.exists(python_path):
+                return python_path
+        
+        # If no virtual environment is detected, use system Python
+        logger.warning("No virtual environment detected, using system Python")
+        return sys.executable
+    
+    async def _run_subprocess(self, *args: str, cwd: str) -> tuple:
+        """Run a command without blocking the event loop; returns (returncode, stderr)"""
+        proc = await asyncio.create_subprocess_exec(
+            *args,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+            cwd=cwd
+        )
+        _, stderr = await proc.communicate()
+        return proc.returncode, stderr.decode('utf-8', errors='replace')
+
+    async def _generate_pdf_with_rendercv(self, yaml_content: str, output_path: str) -> str:
+        """Generate PDF using RenderCV"""
+        try:
+            # RenderCV writes Typst sources and theme files (plus Markdown and
+            # PNGs from the CLI) beside the PDF, so every render runs in a
+            # temporary directory and only the PDF leaves it
+            with tempfile.TemporaryDirectory(dir=_TMPFS_DIR) as temp_dir:
+                if _rendercv_renderer is not None:
+                    # No interpreter start-up or RenderCV import per render
+                    temp_pdf_path, errors = await asyncio.to_thread(self._render_rendercv_in_process,
+                                                                    yaml_content, temp_dir)
+                    if errors:
+                        logger.error(f"RenderCV failed: {errors}")
+                        raise Exception(f"RenderCV failed: {errors}")
+                else:
+                    # Write YAML content to temporary file
+                    yaml_file = os.path.join(temp_dir, "resume.yaml")
+                    await self._write_output(yaml_file, yaml_content)
+                    
+                    # Generate a temporary PDF path
+                    temp_pdf_path = os.path.join(temp_dir, "output.pdf")
+                    
+                    # Get the virtual environment's Python executable path
+                    venv_python = self._get_venv_python_path()
+                    
+                    # Use RenderCV to generate PDF with specific output path
+                    # Use python -m rendercv to ensure we're using the right environment
+                    returncode, stderr = await self._run_subprocess(
+                        venv_python, '-m', 'rendercv', 'render', yaml_file, '--pdf-path', temp_pdf_path,
+                        cwd=temp_dir
+                    )
+                    
+                    if returncode != 0:
+                        logger.error(f"RenderCV failed: {stderr}")
+                        raise Exception(f"RenderCV failed: {stderr}")
+                
+                # Copy the PDF to the final output path; a missing or non-PDF
+                # output fails the copy. The copy is renamed into place, so it
+                # never writes through a hard link into the PDF cache.
+                try:
+                    await asyncio.to_thread(self._copy_pdf, temp_pdf_path, output_path)
+                except FileNotFoundError:
+                    raise Exception("PDF file was not generated by RenderCV")
+                return output_path
+                    
+        except Exception as e:
+            logger.error(f"Error generating PDF with RenderCV: {str(e)}")
+            raise Exception(f"Error generating PDF with RenderCV: {str(e)}")
+    
+    def _render_rendercv_in_process(self, yaml_content: str, output_dir: str) -> tuple:
+        """Render YAML with the RenderCV library into output_dir; returns
+        (pdf path, None), or (None, validation errors)"""
+        with _RENDERCV_LOCK:
+            try:
+                data_model = _rendercv_read_yaml(yaml_content)
+            except pydantic.ValidationError as e:
+                return None, _rendercv_data.parse_validation_errors(e)
+            # rendercv.api's create_a_pdf_* functions stop at the Typst
+            # source, so the PDF is compiled from it here, as the CLI does
+            typst_path = _rendercv_renderer.create_a_typst_file_and_copy_theme_files(data_model, Path(output_dir))
+            return str(_rendercv_renderer.render_a_pdf_from_typst(typst_path)), None
+    
+    async def render_yaml_to_pdf(self, yaml_content: str, output_path: str) -> str:
+        """Render RenderCV YAML to a PDF at output_path, reusing earlier renders"""
+        return await self._render_pdf_cached(yaml_content, output_path)
+    
+    async def _render_pdf_cached(self, yaml_content: str, output_path: str) -> str:
+        """Render YAML to PDF with RenderCV, reusing an earlier render of identical YAML"""
+        digest = hashlib.blake2b(yaml_content.encode('utf-8'), digest_size=16).hexdigest()
+        cache_path = os.path.join(self._pdf_cache_dir, f"{digest}.pdf")
+        
+        # Concurrent misses on the same YAML wait for a single render
+        entry = self._render_locks.setdefault(digest, [asyncio.Lock(), 0])
+        entry[1] += 1
+        try:
+            async with entry[0]:
+                try:
+                    # Linking the cached PDF doubles as the existence check
+                    await asyncio.to_thread(self._copy_pdf, cache_path, output_path)
+                    logger.info(f"Reusing cached RenderCV PDF {digest}")
+                except FileNotFoundError:
+                    await self._generate_pdf_with_rendercv(yaml_content, output_path)
+                    await asyncio.to_thread(self._copy_file, output_path, cache_path)
+        finally:
+            entry[1] -= 1
+            if not entry[1]:
+                del self._render_locks[digest]
+        return output_path
+    
+    def _copy_pdf(self, source: str, destination: str) -> None:
+        """_copy_file for PDFs: raises FileNotFoundError unless source is one,
+        so a failed render, or a cache entry of Typst source left by earlier
+        builds, is never served or cached"""
+        if not _is_pdf(source):
+            raise FileNotFoundError(source)
+        self._copy_file(source, destination)
+    
+    def _copy_file(self, source: str, destination: str) -> None:
+        """Hard-link a file (copying only across filesystems) so the
+        destination never appears half-written"""
+        partial_path = f"{destination}.partial"
+        try:
+            os.link(source, partial_path)
+        except OSError:
+            shutil.copy2(source, partial_path)
+        os.replace(partial_path, destination)
+    
+    async def _read_resume(self) -> str:
+        """Read main.tex, reusing the cached content while its mtime is unchanged"""
+        resume_path = os.path.join(settings.cv_directory, "main.tex")
+        
+        # Raises FileNotFoundError when the resume is missing
+        st = await asyncio.to_thread(os.stat, resume_path)
+        if self._resume_cache and self._resume_cache[0] == st.st_mtime_ns:
+            return self._resume_cache[1]
+        
+        async with aiofiles.open(resume_path, 'r', encoding='utf-8') as file:
+            resume_content = await file.read()
+        
+        self._resume_cache = (st.st_mtime_ns, resume_content)
+        return resume_content
+    
+    async def _write_output(self, path: str, content: str) -> None:
+        """Write an output file, encoded once and in binary mode"""
+        async with aiofiles.open(path, 'wb') as file:
+            await file.write(content.encode('utf-8'))
+
+    async def _load_resume_node(self, state: ResumeState) -> ResumeState:
+        """Load the current resume content"""
+        try:
+            logger.info(f"Loading resume for session {state['session_id']}")
+            
+            # Load the LaTeX resume
+            try:
+                resume_content = await self._read_resume()
+                
+                state["original_resume"] = resume_content
+                state["current_step"] = "resume_loaded"
+                logger.info("Resume loaded successfully")
+            except FileNotFoundError:
+                state["error"] = "Resume file not found"
+                logger.error("Resume file not found")
+                
+        except Exception as e:
+            state["error"] = f"Error loading resume: {str(e)}"
+            logger.error(f"Error loading resume: {str(e)}", exc_info=True)
+            
+        return state
+    
+    async def _modify_content_node(self, state: ResumeState) -> ResumeState:
+        """Modify the resume content based on job description"""
+        try:
+            logger.info(f"Modifying content for session {state['session_id']}")
+            
+            # The instructions and the resume are the same on every request
+            # for a given resume, so they come first and are marked for
+            # Anthropic prompt caching; only the job fields follow them
+            resume_prompt = "".join((_MODIFY_PROMPT_HEAD, "Original Resume:\n", state['original_resume']))
+            request_prompt = "".join((
+                "\n\nJob Description:\nCompany: ", state['company_name'],
+                "\nPosition: ", state['position_title'],
+                "\nJob Description: ", state['job_description'],
+                "\nAdditional Requirements: ", str(state.get('requirements', 'None')),
+                _MODIFY_PROMPT_TAIL
+            ))
             
             messages = [
-                SystemMessage(content="You are an expert in converting LaTeX resumes to RenderCV YAML format. Ensure accurate extraction of all information while maintaining proper YAML structure."),
+                _MODIFY_SYSTEM_MESSAGE,
+                HumanMessage(content=[
+                    {"type": "text", "text": resume_prompt, "cache_control": {"type": "ephemeral"}},
+                    {"type": "text", "text": request_prompt}
+                ])
+            ]
+            
+            # The output is the original resume with points trimmed, plus
+            # comments marking the changes; LaTeX averages over two characters
+            # per token, and the fixed 1000 leaves room for the comments
+            max_tokens = min(_MAX_OUTPUT_TOKENS, len(state['original_resume']) // 2 + 1000)
+            
+            timestamp = time.strftime("%Y%m%d_%H%M%S")
+            output_stem = f"modified_resume_{state['session_id']}_{timestamp}"
+            tex_path = os.path.join(settings.output_directory, f"{output_stem}.tex")
+            
+            # Stream the response so callers of stream_modified_resume see
+            # tokens as soon as they are generated, and write each chunk to
+            # the LaTeX file as it arrives so disk I/O overlaps generation
+            chunks = []
+            cache_read_tokens = None
+            async with aiofiles.open(tex_path, 'wb') as file:
+                async for chunk in self.llm.astream(messages, max_tokens=max_tokens):
+                    if chunk.usage_metadata and "input_token_details" in chunk.usage_metadata:
+                        cache_read_tokens = chunk.usage_metadata["input_token_details"].get("cache_read")
+                    chunks.append(chunk.content)
+                    await file.write(chunk.content.encode('utf-8'))
+            
+            if cache_read_tokens is not None:
+                logger.info(f"Modification prompt cache read tokens: {cache_read_tokens}")
+            
+            state["modified_resume"] = "".join(chunks)
+            state["output_stem"] = output_stem
+            state["tex_file"] = tex_path
+            state["current_step"] = "content_modified"
+            logger.info("Resume content modification completed")
+            
+        except Exception as e:
+            state["error"] = f"Error modifying content: {str(e)}"
+            logger.error(f"Error modifying content: {str(e)}", exc_info=True)
+            
+        return state
+    
+    async def _convert_to_rendercv_node(self, state: ResumeState) -> ResumeState:
+        """Convert LaTeX resume to RenderCV YAML format"""
+        try:
+            logger.info(f"Converting to RenderCV format for session {state['session_id']}")
+            
+            # Resumes using the standard macros convert without an LLM call
+            rendercv_data = latex_to_rendercv(state['modified_resume'])
+            if rendercv_data is not None:
+                state["rendercv_yaml"] = yaml.dump(rendercv_data, Dumper=_YAML_DUMPER,
+                                                    sort_keys=False, allow_unicode=True)
+                state["current_step"] = "converted_to_rendercv"
+                logger.info("Resume converted to RenderCV YAML format without the LLM")
+                return state
+            
+            conversion_prompt = "".join((
+                _CONVERT_PROMPT_HEAD, state['modified_resume'], _CONVERT_PROMPT_TAIL
+            ))
+            
+            messages = [
+                _CONVERT_SYSTEM_MESSAGE,
                 HumanMessage(content=conversion_prompt)
             ]
             
@@ -508,48 +640,40 @@ Return only the complete YAML content for RenderCV, properly formatted and ready
         try:
             logger.info(f"Formatting output for session {state['session_id']}")
             
-            # Save the modified resume
+            # The LaTeX file was already written while modify_content streamed
             output_dir = settings.output_directory
-            os.makedirs(output_dir, exist_ok=True)
+            output_stem = state["output_stem"]
             
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            tex_file = f"modified_resume_{state['session_id']}_{timestamp}.tex"
-            yaml_file = f"modified_resume_{state['session_id']}_{timestamp}.yaml"
-            pdf_file_latex = f"modified_resume_{state['session_id']}_{timestamp}_latex.pdf"
-            pdf_file_rendercv = f"modified_resume_{state['session_id']}_{timestamp}_rendercv.pdf"
-            
-            tex_path = os.path.join(output_dir, tex_file)
-            yaml_path = os.path.join(output_dir, yaml_file)
-            pdf_path_latex = os.path.join(output_dir, pdf_file_latex)
-            pdf_path_rendercv = os.path.join(output_dir, pdf_file_rendercv)
-            
-            # Save LaTeX file
-            with open(tex_path, 'w', encoding='utf-8') as file:
-                file.write(state["modified_resume"])
-            
-            # Save YAML file
-            with open(yaml_path, 'w', encoding='utf-8') as file:
-                file.write(state["rendercv_yaml"])
+            yaml_path = os.path.join(output_dir, f"{output_stem}.yaml")
+            pdf_path_rendercv = os.path.join(output_dir, f"{output_stem}_rendercv.pdf")
             
+            # Save the YAML file while RenderCV renders its own copy
+            yaml_result, pdf_result = await asyncio.gather(
+                self._write_output(yaml_path, state["rendercv_yaml"]),
+                self._render_pdf_cached(state["rendercv_yaml"], pdf_path_rendercv),
+                return_exceptions=True
+            )
+            if isinstance(yaml_result, Exception):
+                raise yaml_result
+
             # Try to generate PDF with RenderCV (primary method)
             rendercv_pdf_path = None
-            try:
-                self._generate_pdf_with_rendercv(state["rendercv_yaml"], pdf_path_rendercv)
+            if isinstance(pdf_result, Exception):
+                logger.warning(f"RenderCV PDF generation failed: {str(pdf_result)}")
+            else:
                 rendercv_pdf_path = pdf_path_rendercv
                 logger.info(f"RenderCV PDF generated successfully: {pdf_path_rendercv}")
-            except Exception as e:
-                logger.warning(f"RenderCV PDF generation failed: {str(e)}")
             
             # Store session data
-            self.sessions[state["session_id"]] = {
+            self._store_session(state["session_id"], {
                 "timestamp": datetime.now(),
                 "company_name": state["company_name"],
                 "position_title": state["position_title"],
-                "tex_file": tex_path,
+                "tex_file": state["tex_file"],
                 "yaml_file": yaml_path,
                 "pdf_file_rendercv": rendercv_pdf_path,
                 "job_description": state["job_description"]
-            }
+            })
             
             state["current_step"] = "completed"
             logger.info(f"Output formatted and saved")
@@ -565,30 +689,189 @@ Return only the complete YAML content for RenderCV, properly formatted and ready
                           session_id: str = None) -> Dict[str, Any]:
         """Main method to modify resume based on job description"""
         
+        # Identical inputs against an unchanged resume reuse the previous output
+        cache_key = await self._result_cache_key(job_description, company_name,
+                                                 position_title, requirements)
+        reused = await self._reuse_result(cache_key, session_id)
+        if reused is not None:
+            return reused
+        
+        if not cache_key:
+            output, _ = await self._run_modification(job_description, company_name, position_title,
+                                                     requirements, session_id)
+            return output
+        
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[cache_key] = future
+        try:
+            # Checked only once the future is registered, so duplicates that
+            # arrive meanwhile wait on it instead of reading the disk too
+            persisted = await self._load_persisted_result(cache_key)
+            if persisted:
+                output, session_data = persisted
+                self._store_session(session_id, {**session_data, "timestamp": datetime.now()})
+                logger.info(f"Reusing persisted modification for session {session_id}")
+            else:
+                output, session_data = await self._run_modification(job_description, company_name,
+                                                                    position_title, requirements, session_id)
+            future.set_result((dict(output), session_data))
+        except Exception as e:
+            future.set_exception(e)
+            future.exception()  # Mark retrieved in case nobody was waiting
+            raise
+        finally:
+            if not future.done():
+                future.cancel()
+            if self._inflight.get(cache_key) is future:
+                del self._inflight[cache_key]
+        
+        await self._remember_result(cache_key, output, session_data, persist=not persisted)
+        return output
+    
+    async def _reuse_result(self, cache_key: Optional[str], session_id: str) -> Optional[Dict[str, Any]]:
+        """The result of an identical cached or in-flight request, recorded
+        under session_id; None when there is none to reuse"""
+        if not cache_key:
+            return None
+        
+        cached = self._result_cache.get(cache_key)
+        if cached and not await asyncio.to_thread(self._files_exist, cached[0]):
+            # Output files were deleted since; regenerate them
+            if self._result_cache.get(cache_key) is cached:
+                del self._result_cache[cache_key]
+            cached = None
+        if cached:
+            # The entry may have been evicted while the files were checked
+            if cache_key in self._result_cache:
+                self._result_cache.move_to_end(cache_key)
+            result, session_data = cached
+            self._store_session(session_id, {**session_data, "timestamp": datetime.now()})
+            logger.info(f"Reusing cached modification for session {session_id}")
+            return dict(result)
+        
+        # A duplicate of a request that is still running waits for its result
+        inflight = self._inflight.get(cache_key)
+        joined_failure = False
+        while inflight:
+            logger.info(f"Waiting for identical in-flight modification for session {session_id}")
+            try:
+                result, session_data = await asyncio.shield(inflight)
+            except asyncio.CancelledError:
+                if not inflight.cancelled():
+                    raise  # This request itself was cancelled
+                # The request running it went away (client disconnect)
+            except Exception:
+                # One failed shared run is retried; a second failure is final
+                if joined_failure:
+                    raise
+                joined_failure = True
+            else:
+                if self._has_pdf(result):
+                    self._store_session(session_id, {**session_data, "timestamp": datetime.now()})
+                    return dict(result)
+                # That run produced no PDF, so it is not reused
+            # Join a retry another duplicate started meanwhile, otherwise
+            # this request makes its own attempt
+            retry = self._inflight.get(cache_key)
+            inflight = retry if retry is not inflight else None
+        return None
+    
+    async def _remember_result(self, cache_key: str, output: Dict[str, Any],
+                               session_data: Dict[str, Any], persist: bool = True) -> None:
+        """Keep a finished result for identical requests, in memory and on disk"""
+        # A result without a PDF (RenderCV and LaTeX both failed) is returned
+        # but not reused, so the next identical request tries again
+        if not self._has_pdf(output):
+            return
+        if persist:
+            await self._persist_result(cache_key, output, session_data)
+        self._result_cache[cache_key] = (dict(output), session_data)
+        if len(self._result_cache) > settings.result_cache_size:
+            self._result_cache.popitem(last=False)
+    
+    def prune_disk_cache(self) -> int:
+        """Delete cached PDFs and persisted results older than
+        settings.disk_cache_ttl; returns how many files were removed"""
+        cutoff = time.time() - settings.disk_cache_ttl
+        removed = 0
+        for directory in (self._pdf_cache_dir, self._result_cache_dir):
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    if entry.is_file() and entry.stat().st_mtime < cutoff:
+                        try:
+                            os.unlink(entry.path)
+                            removed += 1
+                        except FileNotFoundError:
+                            pass
+        return removed
+    
+    def _persisted_result_path(self, cache_key: str) -> str:
+        return os.path.join(self._result_cache_dir, f"{cache_key}.json")
+    
+    async def _load_persisted_result(self, cache_key: str) -> Optional[tuple]:
+        """Read a result saved by an earlier run, possibly before a restart;
+        None if there is none, it has no PDF, or its output files are gone"""
+        try:
+            async with aiofiles.open(self._persisted_result_path(cache_key), 'rb') as file:
+                entry = json.loads(await file.read())
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable persisted result {cache_key}: {str(e)}")
+            return None
+        
+        output = entry["output"]
+        if not self._has_pdf(output) or not await asyncio.to_thread(self._files_exist, output):
+            return None
+        # Results saved by earlier builds may point at Typst source named .pdf
+        if not await asyncio.to_thread(_is_pdf, output.get("pdf_file_rendercv") or output["pdf_file_latex"]):
+            return None
+        return output, entry["session"]
+    
+    async def _persist_result(self, cache_key: str, output: Dict[str, Any],
+                              session_data: Dict[str, Any]) -> None:
+        """Save a finished result next to the PDF cache; failures only cost a future rerun"""
+        path = self._persisted_result_path(cache_key)
+        try:
+            await self._write_output(f"{path}.partial",
+                                     json.dumps({"output": output, "session": session_data}, default=str))
+            os.replace(f"{path}.partial", path)
+        except OSError as e:
+            logger.warning(f"Could not persist result {cache_key}: {str(e)}")
+    
+    @staticmethod
+    def _has_pdf(output: Dict[str, Any]) -> bool:
+        """Whether a modification result includes a generated PDF"""
+        return bool(output.get("pdf_file_rendercv") or output.get("pdf_file_latex"))
+    
+    @staticmethod
+    def _files_exist(output: Dict[str, Any]) -> bool:
+        """Whether every output file recorded in a modification result is still
+        on disk; blocking, so callers run it in a worker thread"""
+        return all(os.path.exists(output[key]) for key in
+                   ("tex_file", "yaml_file", "pdf_file_latex", "pdf_file_rendercv") if output.get(key))
+    
+    async def _run_modification(self, job_description: str, company_name: str,
+                                position_title: str, requirements: Optional[str],
+                                session_id: str) -> tuple:
+        """Run the workflow once; returns the API output and the stored session data"""
         # Initialize state
-        initial_state = ResumeState(
-            session_id=session_id,
-            job_description=job_description,
-            company_name=company_name,
-            position_title=position_title,
-            requirements=requirements,
-            original_resume="",
-            modified_resume="",
-            rendercv_yaml="",
-            current_step="starting",
-            error=None
-        )
+        initial_state = self._initial_state(job_description, company_name, position_title,
+                                            requirements, session_id)
         
         # Run the graph
-        result = await self.graph.ainvoke(initial_state)
-        
+        result = await self.graph.ainvoke(initial_state, config=self._run_config)
+        return self._run_output(result)
+    
+    def _run_output(self, result: Dict[str, Any]) -> tuple:
+        """The API output and stored session data of a finished workflow run"""
         if result.get("error"):
             raise Exception(result["error"])
         
         # Get session data to return file paths
-        session_data = self.sessions.get(result["session_id"], {})
+        session_data = self._get_session(result["session_id"]) or {}
         
-        return {
+        output = {
             "modified_content": result["modified_resume"],
             "rendercv_yaml": result["rendercv_yaml"],
             "tex_file": session_data.get("tex_file"),
@@ -596,20 +879,136 @@ Return only the complete YAML content for RenderCV, properly formatted and ready
             "pdf_file_latex": session_data.get("pdf_file_latex"),
             "pdf_file_rendercv": session_data.get("pdf_file_rendercv")
         }
+        return output, session_data
+    
+    async def stream_modified_resume(self, job_description: str, company_name: str,
+                                     position_title: str, requirements: Optional[str] = None,
+                                     session_id: str = None) -> AsyncIterator[str]:
+        """Run the workflow and yield the modified LaTeX as the model generates it;
+        a cached or in-flight identical request is reused and yielded whole"""
+        cache_key = await self._result_cache_key(job_description, company_name,
+                                                 position_title, requirements)
+        reused = await self._reuse_result(cache_key, session_id)
+        if reused is None and cache_key:
+            persisted = await asyncio.to_thread(os.path.exists, self._persisted_result_path(cache_key))
+            if persisted or cache_key in self._inflight:
+                # modify_resume restores the saved result, or joins the run
+                # that another request started meanwhile
+                reused = await self.modify_resume(job_description, company_name, position_title,
+                                                  requirements, session_id)
+        if reused is not None:
+            if reused["modified_content"]:
+                yield reused["modified_content"]
+            return
+        
+        # Identical requests arriving while this one streams wait for it
+        future = None
+        if cache_key:
+            future = asyncio.get_running_loop().create_future()
+            self._inflight[cache_key] = future
+        
+        initial_state = self._initial_state(job_description, company_name, position_title,
+                                            requirements, session_id)
+        try:
+            final_state: Dict[str, Any] = {}
+            async for mode, payload in self.graph.astream(initial_state, config=self._run_config,
+                                                            stream_mode=["messages", "values"]):
+                if mode == "values":
+                    final_state = payload
+                    continue
+                chunk, metadata = payload
+                if metadata.get("langgraph_node") == "modify_content" and chunk.content:
+                    yield chunk.content
+            
+            output, session_data = self._run_output(final_state)
+            if future:
+                future.set_result((dict(output), session_data))
+        except Exception as e:
+            if future:
+                future.set_exception(e)
+                future.exception()  # Mark retrieved in case nobody was waiting
+            raise
+        finally:
+            if future:
+                if not future.done():
+                    future.cancel()
+                if self._inflight.get(cache_key) is future:
+                    del self._inflight[cache_key]
+        
+        if cache_key:
+            await self._remember_result(cache_key, output, session_data)
+    
+    def _initial_state(self, job_description: str, company_name: str, position_title: str,
+                       requirements: Optional[str], session_id: str) -> ResumeState:
+        """Build the starting state for a workflow run"""
+        return ResumeState(
+            session_id=session_id,
+            job_description=job_description,
+            company_name=company_name,
+            position_title=position_title,
+            requirements=requirements,
+            original_resume="",
+            modified_resume="",
+            rendercv_yaml="",
+            output_stem="",
+            tex_file=None,
+            current_step="starting",
+            error=None
+        )
+    
+    async def _result_cache_key(self, job_description: str, company_name: str,
+                                position_title: str, requirements: Optional[str]) -> Optional[str]:
+        """Hash the resume and request inputs; None when the resume cannot be read"""
+        try:
+            resume_content = await self._read_resume()
+        except FileNotFoundError:
+            return None
+        
+        digest = hashlib.blake2b(digest_size=16)
+        for part in (resume_content, job_description, company_name, position_title, requirements or ""):
+            digest.update(part.encode("utf-8"))
+            digest.update(b"\x00")
+        return digest.hexdigest()
     
     async def get_current_resume_content(self) -> str:
         """Get the current resume content"""
-        resume_path = os.path.join(settings.cv_directory, "main.tex")
-        
-        if os.path.exists(resume_path):
-            with open(resume_path, 'r', encoding='utf-8') as file:
-                return file.read()
-        else:
+        try:
+            return await self._read_resume()
+        except FileNotFoundError:
             raise FileNotFoundError("Resume file not found")
     
     async def get_session_history(self, session_id: str) -> Dict[str, Any]:
         """Get modification history for a session"""
-        if session_id in self.sessions:
-            return self.sessions[session_id]
+        session_data = self._get_session(session_id)
+        if session_data is not None:
+            return session_data
         else:
             return {"message": "Session not found"}
+    
+    def _get_session(self, session_id: str) -> Optional[Dict[str, Any]]:
+        """Look up a live session, dropping it once settings.session_ttl has passed
+        since it was last stored or read"""
+        entry = self.sessions.get(session_id)
+        if entry is None:
+            return None
+        now = time.monotonic()
+        if entry[0] <= now:
+            del self.sessions[session_id]
+            return None
+        # Reading renews the session, so dict order stays expiry order
+        self.sessions[session_id] = (now + settings.session_ttl, entry[1])
+        self.sessions.move_to_end(session_id)
+        return entry[1]
+    
+    def _store_session(self, session_id: str, session_data: Dict[str, Any]) -> None:
+        """Record session data, evicting expired and least recently used sessions"""
+        now = time.monotonic()
+        self.sessions[session_id] = (now + settings.session_ttl, session_data)
+        self.sessions.move_to_end(session_id)
+        
+        # Oldest entries sit at the front, so expired ones are dropped from there
+        while self.sessions:
+            oldest_id, (expires_at, _) = next(iter(self.sessions.items()))
+            if expires_at > now and len(self.sessions) <= settings.session_cache_size:
+                break
+            del self.sessions[oldest_id]
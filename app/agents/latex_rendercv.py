@@ -0,0 +1,293 @@
+"""
+Deterministic LaTeX to RenderCV conversion for resumes built on the widely
+used "Jake's Resume" macros (\\resumeSubheading, \\resumeItem,
+\\resumeProjectHeading, ...). Anything the parser does not recognise makes
+it give up so the caller can fall back to the LLM conversion.
+"""
+import logging
+import re
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+_COMMENT_RE = re.compile(r"(?<!\\)%.*")
+_DOCUMENT_RE = re.compile(r"\\begin\{document\}(.*)\\end\{document\}", re.DOTALL)
+_SECTION_RE = re.compile(r"\\section\*?\s*(?=\{)")
+_MACRO_RE = re.compile(r"\\([A-Za-z]+)\*?")
+_NAME_RE = re.compile(r"(?:\\textbf\s*)?\{\\Huge\s*(?:\\scshape\s*)?([^{}]+)\}")
+_HREF_RE = re.compile(r"\\href\{([^{}]*)\}\{((?:[^{}]|\{[^{}]*\})*)\}")
+_VSPACE_RE = re.compile(r"\\vspace\*?\{[^{}]*\}")
+_DECLARATION_RE = re.compile(r"\\(?:small|footnotesize|normalsize|large|Large|LARGE|huge|Huge|scshape|bfseries|itshape)\b\s*")
+_HEADER_SEPARATOR_RE = re.compile(r"\$\|\$|\\\\|\\textbar\b|\|")
+_ITEMIZE_RE = re.compile(r"\\(?:begin\{itemize\}(?:\[[^\]]*\])?|end\{itemize\}|item\b)")
+_PHONE_RE = re.compile(r"^\+[\d\s().-]{7,}$")
+_LINKEDIN_RE = re.compile(r"^(?:https?://)?(?:www\.)?linkedin\.com/in/([^/?#]+)/?$")
+_GITHUB_RE = re.compile(r"^(?:https?://)?(?:www\.)?github\.com/([^/?#]+)/?$")
+_WHITESPACE_RE = re.compile(r"\s+")
+
+# Inline formatting, innermost groups first; RenderCV renders markdown
+_INLINE_RES = (
+    (re.compile(r"\\textbf\{([^{}]*)\}"), r"**\1**"),
+    (re.compile(r"\\(?:textit|emph)\{([^{}]*)\}"), r"*\1*"),
+    (re.compile(r"\\(?:underline|text|textnormal|mbox|small|footnotesize)\{([^{}]*)\}"), r"\1"),
+    (re.compile(r"\\href\{([^{}]*)\}\{([^{}]*)\}"), r"[\2](\1)"),
+)
+_ESCAPES = (("\\&", "&"), ("\\%", "%"), ("\\$", "$"), ("\\#", "#"), ("\\_", "_"))
+
+# Macros that only open or close lists and carry no content
+_LIST_MARKERS = frozenset({
+    "resumeSubHeadingListStart", "resumeSubHeadingListEnd",
+    "resumeItemListStart", "resumeItemListEnd",
+})
+
+
+class _UnsupportedLatex(ValueError):
+    """Raised when the LaTeX uses something the parser does not understand"""
+
+
+def latex_to_rendercv(latex: str) -> Optional[Dict[str, Any]]:
+    """Convert a LaTeX resume to RenderCV data, or None if it cannot be parsed exactly"""
+    try:
+        return _parse_resume(latex)
+    except _UnsupportedLatex as e:
+        logger.info(f"Deterministic RenderCV conversion not possible: {str(e)}")
+        return None
+
+
+def _parse_resume(latex: str) -> Dict[str, Any]:
+    """Parse the document body into RenderCV's cv and design mappings"""
+    document = _DOCUMENT_RE.search(_COMMENT_RE.sub("", latex))
+    if not document:
+        raise _UnsupportedLatex("no document body")
+    body = document.group(1)
+
+    section_starts = [m.start() for m in _SECTION_RE.finditer(body)]
+    if not section_starts:
+        raise _UnsupportedLatex("no sections")
+
+    cv = _parse_header(body[:section_starts[0]])
+    sections: Dict[str, List[Any]] = {}
+    for start, end in zip(section_starts, section_starts[1:] + [len(body)]):
+        title_start = _SECTION_RE.match(body, start).end()
+        title, content_start = _read_group(body, title_start)
+        title = _to_text(title)
+        entries = _parse_section(title, body[content_start:end])
+        if entries:
+            if title in sections:
+                raise _UnsupportedLatex(f"duplicate section {title!r}")
+            sections[title] = entries
+
+    cv["sections"] = sections
+    return {"cv": cv, "design": {"theme": "sb2nov"}}
+
+
+def _parse_header(header: str) -> Dict[str, Any]:
+    """Extract the name and contact details above the first section"""
+    header = header.replace("\\begin{center}", "").replace("\\end{center}", "")
+    name_match = _NAME_RE.search(header)
+    if not name_match:
+        raise _UnsupportedLatex("name not found")
+
+    cv: Dict[str, Any] = {"name": _to_text(name_match.group(1))}
+    social_networks = []
+    rest = header[:name_match.start()] + header[name_match.end():]
+    rest = _DECLARATION_RE.sub("", _VSPACE_RE.sub("", rest))
+
+    for segment in _HEADER_SEPARATOR_RE.split(rest):
+        segment = segment.strip()
+        if not segment:
+            continue
+        href = _HREF_RE.fullmatch(segment)
+        if href:
+            url = href.group(1).strip()
+            linkedin = _LINKEDIN_RE.match(url)
+            github = _GITHUB_RE.match(url)
+            if url.startswith("mailto:") and "email" not in cv:
+                cv["email"] = url[len("mailto:"):]
+            elif linkedin:
+                social_networks.append({"network": "LinkedIn", "username": linkedin.group(1)})
+            elif github:
+                social_networks.append({"network": "GitHub", "username": github.group(1)})
+            elif url.startswith(("http://", "https://")) and "website" not in cv:
+                cv["website"] = url
+            else:
+                raise _UnsupportedLatex(f"unrecognised link {url!r}")
+            continue
+
+        text = _to_text(segment)
+        if _PHONE_RE.match(text) and "phone" not in cv:
+            # RenderCV only accepts international numbers
+            cv["phone"] = text
+        elif sum(c.isdigit() for c in text) >= 7:
+            raise _UnsupportedLatex(f"phone number without country code {text!r}")
+        elif "location" not in cv:
+            cv["location"] = text
+        else:
+            raise _UnsupportedLatex(f"unrecognised header text {text!r}")
+
+    if social_networks:
+        cv["social_networks"] = social_networks
+    return cv
+
+
+def _parse_section(title: str, content: str) -> List[Any]:
+    """Turn one section's macros into a homogeneous list of RenderCV entries"""
+    if content.lstrip().startswith("\\begin{itemize}"):
+        return _parse_label_list(content)
+
+    is_education = "education" in title.lower()
+    entries: List[Dict[str, Any]] = []
+    current: Optional[Dict[str, Any]] = None
+    pos = 0
+    while True:
+        match = _MACRO_RE.search(content, pos)
+        gap = content[pos:match.start() if match else len(content)]
+        if gap.strip():
+            raise _UnsupportedLatex(f"unexpected text in {title!r}: {gap.strip()[:40]!r}")
+        if not match:
+            break
+        macro, pos = match.group(1), match.end()
+
+        if macro in _LIST_MARKERS:
+            continue
+        if macro == "vspace":
+            _, pos = _read_args(content, pos, 1)
+        elif macro == "resumeSubheading":
+            (a, b, c, d), pos = _read_args(content, pos, 4)
+            if is_education:
+                current = {"institution": a, "area": c, "location": b, "date": d}
+            else:
+                current = {"company": c, "position": a, "location": d, "date": b}
+            entries.append(current)
+        elif macro == "resumeSubSubheading" and current and "company" in current:
+            (a, b), pos = _read_args(content, pos, 2)
+            current = {"company": current["company"], "position": a, "date": b}
+            entries.append(current)
+        elif macro == "resumeProjectHeading":
+            (a, b), pos = _read_args(content, pos, 2)
+            current = {"name": a, "date": b}
+            entries.append(current)
+        elif macro == "resumeItem":
+            (item,), pos = _read_args(content, pos, 1)
+            # The older two-argument \resumeItem{title}{text} is not supported
+            if content[pos:].lstrip().startswith("{"):
+                raise _UnsupportedLatex("two-argument \\resumeItem")
+            if current is None:
+                entries.append({"bullet": item})
+            else:
+                current.setdefault("highlights", []).append(item)
+        else:
+            raise _UnsupportedLatex(f"unsupported macro \\{macro} in {title!r}")
+
+    return _finish_entries(title, entries)
+
+
+def _parse_label_list(content: str) -> List[Dict[str, str]]:
+    """Parse skill lines written as \\textbf{Label}{: details} in an itemize"""
+    entries = []
+    leftover = []
+    pos = 0
+    while True:
+        start = content.find("\\textbf", pos)
+        if start == -1:
+            leftover.append(content[pos:])
+            break
+        leftover.append(content[pos:start])
+        (label,), pos = _read_args(content, start + len("\\textbf"), 1)
+        details_end = content.find("\\\\", pos)
+        next_label = content.find("\\textbf", pos)
+        if content[pos:].lstrip().startswith("{"):
+            (details,), pos = _read_args(content, pos, 1)
+        else:
+            ends = [i for i in (details_end, next_label) if i != -1]
+            end = min(ends) if ends else len(content)
+            # Plain details may still close enclosing \item{...} groups
+            details, pos = _to_text(content[pos:end].rstrip().rstrip("}")), end
+        details = details.lstrip(":").strip()
+        if not label or not details:
+            raise _UnsupportedLatex("incomplete label line")
+        entries.append({"label": label, "details": details})
+
+    # Everything outside the label lines must be list scaffolding
+    scaffolding = _DECLARATION_RE.sub("", _ITEMIZE_RE.sub("", "".join(leftover)))
+    if scaffolding.replace("{", "").replace("}", "").replace("\\\\", "").strip():
+        raise _UnsupportedLatex("unexpected content in label list")
+    if not entries:
+        raise _UnsupportedLatex("empty label list")
+    return entries
+
+
+def _finish_entries(title: str, entries: List[Dict[str, Any]]) -> List[Any]:
+    """Drop empty fields and check the section uses a single RenderCV entry type"""
+    required = {
+        "company": ("company", "position"),
+        "institution": ("institution", "area"),
+        "name": ("name",),
+        "bullet": ("bullet",),
+    }
+    kinds = set()
+    finished = []
+    for entry in entries:
+        entry = {key: value for key, value in entry.items() if value}
+        kind = next((key for key in required if key in entry), None)
+        if kind is None or not all(entry.get(key) for key in required[kind]):
+            raise _UnsupportedLatex(f"incomplete entry in {title!r}")
+        kinds.add(kind)
+        finished.append(entry)
+    if len(kinds) > 1:
+        raise _UnsupportedLatex(f"mixed entry types in {title!r}")
+    return finished
+
+
+def _read_args(text: str, pos: int, count: int) -> Tuple[List[str], int]:
+    """Read count brace groups starting at pos, converted to plain text"""
+    args = []
+    for _ in range(count):
+        while pos < len(text) and text[pos].isspace():
+            pos += 1
+        raw, pos = _read_group(text, pos)
+        args.append(_to_text(raw))
+    return args, pos
+
+
+def _read_group(text: str, pos: int) -> Tuple[str, int]:
+    """Return the raw content of the brace group opening at pos and the index after it"""
+    if pos >= len(text) or text[pos] != "{":
+        raise _UnsupportedLatex("expected a {...} argument")
+    depth = 0
+    i = pos
+    while i < len(text):
+        char = text[i]
+        if char == "\\":
+            i += 2
+            continue
+        if char == "{":
+            depth += 1
+        elif char == "}":
+            depth -= 1
+            if depth == 0:
+                return text[pos + 1:i], i + 1
+        i += 1
+    raise _UnsupportedLatex("unbalanced braces")
+
+
+def _to_text(latex: str) -> str:
+    """Convert inline LaTeX to RenderCV's markdown-flavoured plain text"""
+    text = latex.replace("\\{", "\x00").replace("\\}", "\x01")
+    text = _DECLARATION_RE.sub("", _VSPACE_RE.sub("", text))
+    changed = True
+    while changed:
+        changed = False
+        for pattern, replacement in _INLINE_RES:
+            text, count = pattern.subn(replacement, text)
+            changed = changed or bool(count)
+
+    text = text.replace("$|$", "|").replace("\\\\", " ").replace("~", " ").replace("--", "\u2013")
+    if _MACRO_RE.search(text) or "$" in text.replace("\\$", ""):
+        raise _UnsupportedLatex(f"unsupported markup in {latex.strip()[:40]!r}")
+
+    text = text.replace("{", "").replace("}", "")
+    for escaped, plain in _ESCAPES:
+        text = text.replace(escaped, plain)
+    text = text.replace("\x00", "{").replace("\x01", "}")
+    return _WHITESPACE_RE.sub(" ", text).strip()
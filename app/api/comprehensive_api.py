@@ -1,14 +1,22 @@
 import logging
 import asyncio
+import hashlib
+import inspect
+import math
 import os
+import time
 import uuid
 import aiofiles
-from datetime import datetime, timedelta
-from typing import Dict, Any, Optional, List
+import orjson
+from collections import defaultdict
+from datetime import datetime
+from functools import wraps
+from typing import Dict, Any, Optional, List, Tuple
 from pathlib import Path
+from urllib.parse import urlsplit
 
-from fastapi import APIRouter, HTTPException, UploadFile, File, Form, Depends, Query, Header, status
-from fastapi.responses import FileResponse, JSONResponse
+from fastapi import APIRouter, HTTPException, UploadFile, File, Form, Depends, Query, Header, Request, status
+from fastapi.responses import JSONResponse, Response
 from fastapi.security import HTTPBearer
 
 from app.models.schemas import (
@@ -26,7 +34,8 @@ from app.models.schemas import (
 )
 from app.auth.dependencies import get_current_user_id, get_optional_user_id, verify_extension_version
 from app.services.user_service import UserService
-from app.agents.graph import ResumeModifierAgent
+from app.agents import get_agent, prune_agent_disk_cache
+from app.api.responses import file_response, stat_or_404
 from app.config import settings
 
 logger = logging.getLogger(__name__)
@@ -35,10 +44,20 @@ router = APIRouter()
 # In-memory storage for demo (replace with database)
 master_resumes_db: Dict[str, Dict[str, Any]] = {}
 generated_resumes_db: Dict[str, Dict[str, Any]] = {}
+generated_resumes_by_user: Dict[str, List[str]] = defaultdict(list)  # user_id -> resume IDs, oldest first
+# A cached modification can hand the same PDF to several records, so a file
+# is only unlinked once no generated resume refers to it
+generated_file_refs: Dict[str, int] = defaultdict(int)  # file_path -> records using it
 user_preferences_db: Dict[str, Dict[str, Any]] = {}
 analytics_db: Dict[str, Any] = {"feedback": [], "keywords": {}, "success_metrics": {}}
 temp_files_db: Dict[str, Dict[str, Any]] = {}
-rate_limits_db: Dict[str, Dict[str, Any]] = {}
+rate_limits_db: Dict[Tuple[str, str], List[float]] = {}
+
+# Content types accepted for resume uploads (PDF and DOCX)
+ALLOWED_RESUME_TYPES = frozenset({
+    "application/pdf",
+    "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+})
 
 # Available templates
 AVAILABLE_TEMPLATES = [
@@ -48,38 +67,200 @@ AVAILABLE_TEMPLATES = [
     {"id": "minimal", "name": "Minimal", "type": "minimal", "description": "Simple and clean layout"},
 ]
 
+# Static response bodies, encoded once at import; the health body only has
+# its timestamp filled in per request
+_TEMPLATES_JSON = orjson.dumps({"templates": AVAILABLE_TEMPLATES})
+# The template list only changes with a deploy, so clients may cache it for
+# a day and then revalidate against the ETag
+_TEMPLATES_HEADERS = {
+    "ETag": f'"{hashlib.blake2b(_TEMPLATES_JSON, digest_size=16).hexdigest()}"',
+    "Cache-Control": "public, max-age=86400",
+}
+_HEALTH_TIMESTAMP = b"__TS__"
+_HEALTH_JSON = orjson.dumps({
+    "status": "healthy",
+    "timestamp": _HEALTH_TIMESTAMP.decode(),
+    "version": settings.version,
+    "service_status": {
+        "database": "connected",
+        "llm_service": "available",
+        "file_storage": "available"
+    }
+})
+# (epoch second, body) of the last health response; probes within a second share it
+_health_body: Tuple[int, bytes] = (0, b"")
+
+
+# Rate limiting: one token bucket per (user_id, endpoint) holding
+# [tokens, last refill on the monotonic clock]; `limit` tokens refill per hour
+RATE_LIMIT_WINDOW_SECONDS = 3600.0
+
+
+def _refill_bucket(user_id: str, endpoint: str, limit: int) -> List[float]:
+    """Return the user's bucket for an endpoint, topped up for the time elapsed"""
+    now = time.monotonic()
+    key = (user_id, endpoint)
+    bucket = rate_limits_db.get(key)
+    if bucket is None:
+        bucket = rate_limits_db[key] = [float(limit), now]
+    else:
+        bucket[0] = min(limit, bucket[0] + (now - bucket[1]) * limit / RATE_LIMIT_WINDOW_SECONDS)
+        bucket[1] = now
+    return bucket
+
+
+def handle_errors(detail: str):
+    """Turn unexpected errors in an endpoint into a logged 500 with `detail`;
+    HTTPExceptions raised by the endpoint itself pass through unchanged"""
+    def decorator(func):
+        @wraps(func)
+        async def wrapper(*args, **kwargs):
+            try:
+                return await func(*args, **kwargs)
+            except HTTPException:
+                raise
+            except Exception as e:
+                logger.error(f"{detail}: {str(e)}", exc_info=True)
+                raise HTTPException(
+                    status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                    detail=f"{detail}: {str(e)}"
+                )
+        return wrapper
+    return decorator
+
+
+def _rate_limit_headers(bucket: List[float], limit: int) -> Dict[str, str]:
+    """X-RateLimit-* headers for a bucket; Reset is the seconds until it is full again"""
+    return {
+        "X-RateLimit-Limit": str(limit),
+        "X-RateLimit-Remaining": str(int(bucket[0])),
+        "X-RateLimit-Reset": str(math.ceil((limit - bucket[0]) * RATE_LIMIT_WINDOW_SECONDS / limit)),
+    }
+
 
 # Rate limiting decorator
 def check_rate_limit(endpoint: str, limit: int):
     def decorator(func):
+        # Found once here; direct calls may pass user_id positionally
+        user_id_index = list(inspect.signature(func).parameters).index("user_id")
+        
+        @wraps(func)
         async def wrapper(*args, **kwargs):
-            user_id = kwargs.get('user_id') or args[0] if args else None
+            user_id = kwargs.get('user_id') or (args[user_id_index] if len(args) > user_id_index else None)
             if user_id:
-                key = f"{user_id}:{endpoint}"
-                now = datetime.utcnow()
-                hour_start = now.replace(minute=0, second=0, microsecond=0)
-                
-                if key not in rate_limits_db:
-                    rate_limits_db[key] = {"count": 0, "reset_time": hour_start + timedelta(hours=1)}
-                
-                rate_data = rate_limits_db[key]
-                if now >= rate_data["reset_time"]:
-                    rate_data["count"] = 0
-                    rate_data["reset_time"] = hour_start + timedelta(hours=1)
-                
-                if rate_data["count"] >= limit:
+                bucket = _refill_bucket(user_id, endpoint, limit)
+                if bucket[0] < 1:
+                    retry_after = math.ceil((1 - bucket[0]) * RATE_LIMIT_WINDOW_SECONDS / limit)
                     raise HTTPException(
                         status_code=status.HTTP_429_TOO_MANY_REQUESTS,
-                        detail="Rate limit exceeded"
+                        detail="Rate limit exceeded",
+                        headers={**_rate_limit_headers(bucket, limit), "Retry-After": str(retry_after)}
                     )
                 
-                rate_data["count"] += 1
+                bucket[0] -= 1
+                # Report the quota taken here rather than recomputing it later
+                headers = _rate_limit_headers(bucket, limit)
             
-            return await func(*args, **kwargs)
+            result = await func(*args, **kwargs)
+            if user_id and isinstance(result, Response):
+                result.headers.update(headers)
+            return result
         return wrapper
     return decorator
 
 
+# Uploads are copied to disk in chunks of this size, never read whole
+UPLOAD_CHUNK_SIZE = 64 * 1024
+
+# Upload directories are created once at import rather than per request
+UPLOAD_DIR = Path(settings.output_directory)
+TEMP_UPLOAD_DIR = UPLOAD_DIR / "temp"
+TEMP_UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
+
+
+def _file_extension(filename: Optional[str]) -> str:
+    """Extension of an uploaded file's name, e.g. ".pdf", ignoring any directory part"""
+    return os.path.splitext(os.path.basename(filename or ""))[1]
+
+
+async def _save_upload(file: UploadFile, path) -> int:
+    """Stream an uploaded file to disk; returns the number of bytes written"""
+    size = 0
+    async with aiofiles.open(path, 'wb') as f:
+        while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+            size += len(chunk)
+            await f.write(chunk)
+    return size
+
+
+# Temp uploads live for a day; expired ones are swept in the background
+# rather than on download
+TEMP_FILE_TTL_SECONDS = 24 * 3600
+TEMP_FILE_SWEEP_INTERVAL_SECONDS = 60
+
+# Files of deleted resumes are queued and unlinked in the background, so
+# delete requests don't wait on the disk
+FILE_DELETE_BATCH_SIZE = 64
+file_delete_queue: "asyncio.Queue[str]" = asyncio.Queue()
+
+
+def _unlink_files(paths: List[str]) -> None:
+    """Delete a batch of files, skipping any that are already gone"""
+    for path in paths:
+        try:
+            os.unlink(path)
+        except FileNotFoundError:
+            pass
+
+
+def _company_from_url(url: str) -> str:
+    """Guess the company from a job page URL's host, e.g. https://www.acme.com/jobs -> acme"""
+    host = urlsplit(url).hostname or ""
+    return host.removeprefix("www.").split(".", 1)[0] or "Unknown Company"
+
+
+async def sweep_expired_temp_files() -> int:
+    """Drop expired temp file records and delete their files; returns how many were removed"""
+    now = time.time()
+    expired_ids = [file_id for file_id, temp_file in temp_files_db.items() if now > temp_file["expires_at"]]
+    paths = [temp_files_db.pop(file_id)["file_path"] for file_id in expired_ids]
+    if paths:
+        # One worker thread handles the whole batch of unlinks
+        await asyncio.to_thread(_unlink_files, paths)
+    return len(paths)
+
+
+async def run_temp_file_sweeper() -> None:
+    """Periodically remove expired temp files and agent cache entries until cancelled"""
+    while True:
+        await asyncio.sleep(TEMP_FILE_SWEEP_INTERVAL_SECONDS)
+        try:
+            removed = await sweep_expired_temp_files()
+            if removed:
+                logger.info(f"Removed {removed} expired temp files")
+            removed = await prune_agent_disk_cache()
+            if removed:
+                logger.info(f"Removed {removed} expired PDF and result cache files")
+        except Exception as e:
+            logger.error(f"Error sweeping temp files: {str(e)}", exc_info=True)
+
+
+async def run_file_deleter() -> None:
+    """Unlink files queued by the delete endpoints, in batches, until cancelled"""
+    while True:
+        paths = [await file_delete_queue.get()]
+        while len(paths) < FILE_DELETE_BATCH_SIZE and not file_delete_queue.empty():
+            paths.append(file_delete_queue.get_nowait())
+        # A record created since the delete was queued may have reclaimed a file
+        paths = [path for path in paths if not generated_file_refs.get(path)]
+        if not paths:
+            continue
+        try:
+            await asyncio.to_thread(_unlink_files, paths)
+        except Exception as e:
+            logger.error(f"Error deleting files: {str(e)}", exc_info=True)
+
+
 # 1. User Management Endpoints
 @router.post("/users/register", response_model=AuthToken)
 async def register_user(user_data: UserRegistration):
@@ -96,81 +277,68 @@ async def login_user(login_data: UserLogin):
 @router.get("/users/profile", response_model=UserProfile)
 async def get_user_profile(user_id: str = Depends(get_current_user_id)):
     """Get user profile information"""
-    return await UserService.get_user_profile(user_id)
+    return UserService.get_user_profile(user_id)
 
 
 # 2. Master Resume Management
 @router.post("/resumes/upload")
+@handle_errors("Failed to upload resume")
 async def upload_master_resume(
     file: UploadFile = File(...),
     metadata: Optional[str] = Form(None),
     user_id: str = Depends(get_current_user_id)
 ):
     """Upload and store user's comprehensive master resume"""
-    try:
-        # Validate file type
-        allowed_types = ["application/pdf", "application/vnd.openxmlformats-officedocument.wordprocessingml.document"]
-        if file.content_type not in allowed_types:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Only PDF and DOCX files are allowed"
-            )
-        
-        # Create unique filename
-        file_extension = Path(file.filename).suffix
-        unique_filename = f"master_resume_{user_id}_{uuid.uuid4()}{file_extension}"
-        file_path = Path(settings.output_directory) / unique_filename
-        
-        # Ensure directory exists
-        file_path.parent.mkdir(exist_ok=True)
-        
-        # Save file
-        async with aiofiles.open(file_path, 'wb') as f:
-            content = await file.read()
-            await f.write(content)
-        
-        # Create resume record
-        resume_id = str(uuid.uuid4())
-        resume_metadata = ResumeMetadata(
-            original_filename=file.filename,
-            file_size=len(content),
-            upload_date=datetime.utcnow(),
-            file_type=file.content_type,
-            parsed_sections=["experience", "education", "skills"]  # Mock data
-        )
-        
-        # Parse resume (simplified)
-        structured_data = {
-            "personal_info": {"name": "User Name", "email": "user@example.com"},
-            "experience": [],
-            "education": [],
-            "skills": []
-        }
-        
-        master_resume = {
-            "id": resume_id,
-            "user_id": user_id,
-            "file_path": str(file_path),
-            "structured_data": structured_data,
-            "metadata": resume_metadata.dict(),
-            "created_at": datetime.utcnow(),
-            "updated_at": datetime.utcnow()
-        }
-        
-        master_resumes_db[user_id] = master_resume
-        
-        return {
-            "message": "Resume uploaded successfully",
-            "resume_id": resume_id,
-            "filename": unique_filename
-        }
-        
-    except Exception as e:
-        logger.error(f"Error uploading resume: {str(e)}", exc_info=True)
+    # Validate file type
+    if file.content_type not in ALLOWED_RESUME_TYPES:
         raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Failed to upload resume: {str(e)}"
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Only PDF and DOCX files are allowed"
         )
+    
+    # Create unique filename
+    file_extension = _file_extension(file.filename)
+    unique_filename = f"master_resume_{user_id}_{uuid.uuid4()}{file_extension}"
+    file_path = UPLOAD_DIR / unique_filename
+    
+    # Save file
+    file_size = await _save_upload(file, file_path)
+    
+    # Create resume record
+    resume_id = str(uuid.uuid4())
+    resume_metadata = ResumeMetadata(
+        original_filename=file.filename,
+        file_size=file_size,
+        upload_date=datetime.utcnow(),
+        file_type=file.content_type,
+        parsed_sections=["experience", "education", "skills"]  # Mock data
+    )
+    
+    # Parse resume (simplified)
+    structured_data = {
+        "personal_info": {"name": "User Name", "email": "user@example.com"},
+        "experience": [],
+        "education": [],
+        "skills": []
+    }
+    
+    master_resume = {
+        "id": resume_id,
+        "user_id": user_id,
+        "file_path": str(file_path),
+        "structured_data": structured_data,
+        "metadata": resume_metadata.dict(),
+        "created_at": datetime.utcnow(),
+        "updated_at": datetime.utcnow()
+    }
+    
+    master_resumes_db[user_id] = master_resume
+    
+    return {
+        "message": "Resume uploaded successfully",
+        "resume_id": resume_id,
+        "filename": unique_filename
+    }
 
 
 @router.get("/resumes/master", response_model=MasterResume)
@@ -221,9 +389,7 @@ async def delete_master_resume(user_id: str = Depends(get_current_user_id)):
     
     # Delete file
     resume_data = master_resumes_db[user_id]
-    file_path = Path(resume_data["file_path"])
-    if file_path.exists():
-        file_path.unlink()
+    file_delete_queue.put_nowait(resume_data["file_path"])
     
     # Remove from database
     del master_resumes_db[user_id]
@@ -233,153 +399,137 @@ async def delete_master_resume(user_id: str = Depends(get_current_user_id)):
 
 # 3. Job Description Processing
 @router.post("/jobs/analyze", response_model=JobAnalysisResponse)
+@handle_errors("Failed to analyze job description")
 async def analyze_job_description(
     request: JobAnalysisRequest,
     user_id: str = Depends(get_current_user_id)
 ):
     """Analyze job description and extract key requirements"""
-    try:
-        # Mock analysis (replace with actual LLM analysis)
-        keywords = ["Python", "FastAPI", "React", "Machine Learning", "API", "Database"]
-        required_skills = ["Python", "Web Development", "Problem Solving"]
-        
-        return JobAnalysisResponse(
-            keywords=keywords,
-            required_skills=required_skills,
-            experience_level="Mid-Senior",
-            industry_focus="Technology",
-            extracted_requirements={
-                "technical_skills": required_skills,
-                "soft_skills": ["Communication", "Team Work"],
-                "years_experience": "3-5"
-            },
-            analysis_metadata={
-                "confidence_score": 0.85,
-                "analysis_timestamp": datetime.utcnow().isoformat()
-            }
-        )
-        
-    except Exception as e:
-        logger.error(f"Error analyzing job description: {str(e)}", exc_info=True)
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Failed to analyze job description: {str(e)}"
-        )
+    # Mock analysis (replace with actual LLM analysis)
+    keywords = ["Python", "FastAPI", "React", "Machine Learning", "API", "Database"]
+    required_skills = ["Python", "Web Development", "Problem Solving"]
+    
+    return JobAnalysisResponse(
+        keywords=keywords,
+        required_skills=required_skills,
+        experience_level="Mid-Senior",
+        industry_focus="Technology",
+        extracted_requirements={
+            "technical_skills": required_skills,
+            "soft_skills": ["Communication", "Team Work"],
+            "years_experience": "3-5"
+        },
+        analysis_metadata={
+            "confidence_score": 0.85,
+            "analysis_timestamp": datetime.utcnow()
+        }
+    )
 
 
 # 4. Resume Modification (Core Feature)
 @router.post("/modify-resume")
 @check_rate_limit("modify-resume", 10)
+@handle_errors("Failed to modify resume")
 async def modify_resume(
     request: ResumeModificationRequest,
     user_id: str = Depends(get_current_user_id)
 ):
     """Generate tailored resume based on job description"""
-    try:
-        # Check if user has master resume
-        if user_id not in master_resumes_db:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Please upload a master resume first"
-            )
-        
-        # Use existing resume modification logic
-        session_id = str(uuid.uuid4())
-        agent = ResumeModifierAgent()
-        
-        result = await agent.modify_resume(
-            job_description=request.job_description,
-            company_name=request.company_name,
-            position_title=request.job_title,
-            session_id=session_id
+    return await _generate_modified_resume(request, user_id)
+
+
+async def _generate_modified_resume(request: ResumeModificationRequest, user_id: str) -> Response:
+    """Shared by the endpoints that modify a resume; each applies its own rate limit"""
+    # Check if user has master resume
+    if user_id not in master_resumes_db:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Please upload a master resume first"
         )
-        
-        # Store generated resume record
-        resume_id = str(uuid.uuid4())
-        generated_resume = {
-            "id": resume_id,
-            "user_id": user_id,
-            "job_title": request.job_title,
-            "company_name": request.company_name,
-            "file_path": result.get("pdf_file_rendercv") or result.get("pdf_file_latex"),
-            "file_url": f"/api/files/download/{resume_id}",
-            "created_at": datetime.utcnow(),
-            "modification_metadata": {
-                "session_id": session_id,
-                "customizations": request.customizations.dict() if request.customizations else {},
-                "source": "RenderCV" if result.get("pdf_file_rendercv") else "LaTeX"
-            },
-            "match_score": 0.85  # Mock score
-        }
-        
-        generated_resumes_db[resume_id] = generated_resume
-        
-        # Return file
-        if result.get("pdf_file_rendercv") and os.path.exists(result["pdf_file_rendercv"]):
-            return FileResponse(
-                path=result["pdf_file_rendercv"],
-                media_type='application/pdf',
-                filename=f"modified_resume_{request.company_name}_{request.job_title}.pdf",
-                headers={"X-Resume-ID": resume_id}
-            )
-        elif result.get("pdf_file_latex") and os.path.exists(result["pdf_file_latex"]):
-            return FileResponse(
-                path=result["pdf_file_latex"],
-                media_type='application/pdf',
-                filename=f"modified_resume_{request.company_name}_{request.job_title}.pdf",
-                headers={"X-Resume-ID": resume_id}
-            )
-        else:
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail="Failed to generate resume"
-            )
-            
-    except Exception as e:
-        logger.error(f"Error modifying resume: {str(e)}", exc_info=True)
+    
+    # Use existing resume modification logic
+    session_id = str(uuid.uuid4())
+    agent = await get_agent()
+    
+    result = await agent.modify_resume(
+        job_description=request.job_description,
+        company_name=request.company_name,
+        position_title=request.job_title,
+        session_id=session_id
+    )
+    
+    # RenderCV PDF, else the LaTeX one; picked once for the record and the response
+    pdf_source = "RenderCV" if result.get("pdf_file_rendercv") else "LaTeX"
+    pdf_path = result.get("pdf_file_rendercv") or result.get("pdf_file_latex")
+    
+    # Store generated resume record
+    resume_id = str(uuid.uuid4())
+    generated_resume = {
+        "id": resume_id,
+        "user_id": user_id,
+        "job_title": request.job_title,
+        "company_name": request.company_name,
+        "file_path": pdf_path,
+        "file_url": f"/api/files/download/{resume_id}",
+        "created_at": datetime.utcnow(),
+        "modification_metadata": {
+            "session_id": session_id,
+            "customizations": request.customizations.dict() if request.customizations else {},
+            "source": pdf_source
+        },
+        "match_score": 0.85  # Mock score
+    }
+    
+    generated_resumes_db[resume_id] = generated_resume
+    generated_resumes_by_user[user_id].append(resume_id)
+    if pdf_path:
+        generated_file_refs[pdf_path] += 1
+    
+    # Return file
+    if not pdf_path:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Failed to modify resume: {str(e)}"
+            detail="Failed to generate resume"
         )
+    return file_response(
+        path=pdf_path,
+        media_type='application/pdf',
+        filename=f"modified_resume_{request.company_name}_{request.job_title}.pdf",
+        headers={"X-Resume-ID": resume_id},
+        stat_result=await stat_or_404(pdf_path)
+    )
 
 
 @router.post("/modify-resume/preview", response_model=ResumeModificationPreview)
+@handle_errors("Failed to preview modifications")
 async def preview_resume_modifications(
     request: ResumeModificationRequest,
     user_id: str = Depends(get_current_user_id)
 ):
     """Preview modifications without generating final PDF"""
-    try:
-        if user_id not in master_resumes_db:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Please upload a master resume first"
-            )
-        
-        # Mock preview (replace with actual analysis)
-        preview = ResumeModificationPreview(
-            proposed_changes={
-                "summary": "Updated to highlight relevant experience",
-                "skills": "Emphasized Python and FastAPI",
-                "experience": "Reordered to show most relevant first"
-            },
-            sections_to_modify=["summary", "skills", "experience"],
-            skills_to_emphasize=request.customizations.emphasize_skills if request.customizations else [],
-            estimated_match_score=0.85,
-            preview_metadata={
-                "analysis_timestamp": datetime.utcnow().isoformat(),
-                "confidence": 0.9
-            }
-        )
-        
-        return preview
-        
-    except Exception as e:
-        logger.error(f"Error previewing modifications: {str(e)}", exc_info=True)
+    if user_id not in master_resumes_db:
         raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Failed to preview modifications: {str(e)}"
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Please upload a master resume first"
         )
+    
+    # Mock preview (replace with actual analysis)
+    preview = ResumeModificationPreview(
+        proposed_changes={
+            "summary": "Updated to highlight relevant experience",
+            "skills": "Emphasized Python and FastAPI",
+            "experience": "Reordered to show most relevant first"
+        },
+        sections_to_modify=["summary", "skills", "experience"],
+        skills_to_emphasize=request.customizations.emphasize_skills if request.customizations else [],
+        estimated_match_score=0.85,
+        preview_metadata={
+            "analysis_timestamp": datetime.utcnow(),
+            "confidence": 0.9
+        }
+    )
+    
+    return preview
 
 
 # 5. Resume History & Management
@@ -391,29 +541,34 @@ async def get_generated_resumes(
     user_id: str = Depends(get_current_user_id)
 ):
     """Get list of all previously generated resumes"""
-    user_resumes = [
-        resume for resume in generated_resumes_db.values()
-        if resume["user_id"] == user_id
-    ]
+    # The index is in creation order, so newest first is simply reversed
+    resume_ids = generated_resumes_by_user.get(user_id, [])
     
     # Filter by company if specified
     if company:
-        user_resumes = [
-            resume for resume in user_resumes
-            if company.lower() in resume["company_name"].lower()
+        # One pass counts the matches but only keeps those on the page
+        company_lower = company.lower()
+        total = 0
+        paginated_resumes = []
+        for resume in map(generated_resumes_db.__getitem__, reversed(resume_ids)):
+            if company_lower in resume["company_name"].lower():
+                if offset <= total < offset + limit:
+                    paginated_resumes.append(resume)
+                total += 1
+    else:
+        # Paginate straight off the index without touching other records
+        total = len(resume_ids)
+        end = max(total - offset, 0)
+        paginated_resumes = [
+            generated_resumes_db[resume_id]
+            for resume_id in reversed(resume_ids[max(end - limit, 0):end])
         ]
     
-    # Sort by creation date (newest first)
-    user_resumes.sort(key=lambda x: x["created_at"], reverse=True)
-    
-    # Paginate
-    total = len(user_resumes)
-    paginated_resumes = user_resumes[offset:offset + limit]
-    
-    # Convert to response models
-    resume_models = [GeneratedResume(**resume) for resume in paginated_resumes]
+    # Records are written by this module in the schema's shape, so the
+    # models are built without re-validating every field on each request
+    resume_models = [GeneratedResume.model_construct(**resume) for resume in paginated_resumes]
     
-    return ResumeHistoryResponse(
+    return ResumeHistoryResponse.model_construct(
         items=resume_models,
         total=total,
         limit=limit,
@@ -443,16 +598,11 @@ async def download_generated_resume(
         )
     
     file_path = resume["file_path"]
-    if not os.path.exists(file_path):
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="File not found"
-        )
-    
-    return FileResponse(
+    return file_response(
         path=file_path,
         media_type='application/pdf',
-        filename=f"resume_{resume['company_name']}_{resume['job_title']}.pdf"
+        filename=f"resume_{resume['company_name']}_{resume['job_title']}.pdf",
+        stat_result=await stat_or_404(file_path)
     )
 
 
@@ -475,22 +625,29 @@ async def delete_generated_resume(
             detail="Access denied"
         )
     
-    # Delete file
-    file_path = resume["file_path"]
-    if os.path.exists(file_path):
-        os.unlink(file_path)
-    
     # Remove from database
     del generated_resumes_db[resume_id]
+    generated_resumes_by_user[user_id].remove(resume_id)
+    
+    # Delete file, unless a cached modification handed it to another record too
+    file_path = resume["file_path"]
+    if file_path:
+        generated_file_refs[file_path] -= 1
+        if generated_file_refs[file_path] <= 0:
+            del generated_file_refs[file_path]
+            file_delete_queue.put_nowait(file_path)
     
     return {"message": "Resume deleted successfully"}
 
 
 # 6. Templates & Customization
 @router.get("/templates")
-async def get_templates():
+async def get_templates(request: Request):
     """Get available resume templates"""
-    return {"templates": AVAILABLE_TEMPLATES}
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and _TEMPLATES_HEADERS["ETag"] in (tag.strip() for tag in if_none_match.split(",")):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=_TEMPLATES_HEADERS)
+    return Response(content=_TEMPLATES_JSON, media_type="application/json", headers=_TEMPLATES_HEADERS)
 
 
 @router.get("/user-preferences", response_model=UserPreferences)
@@ -578,40 +735,33 @@ async def submit_feedback(
 # 8. Chrome Extension Support
 @router.post("/extension/quick-modify")
 @check_rate_limit("quick-modify", 20)
+@handle_errors("Failed to modify resume")
 async def extension_quick_modify(
     request: ExtensionQuickModifyRequest,
     user_id: str = Depends(get_current_user_id),
     extension_version: str = Depends(verify_extension_version)
 ):
     """Streamlined endpoint for Chrome extension direct usage"""
-    try:
-        if user_id not in master_resumes_db:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Please upload a master resume first"
-            )
-        
-        # Extract company name and job title from URL or text
-        company_name = request.page_url.split("//")[1].split(".")[0] if "//" in request.page_url else "Unknown Company"
-        job_title = "Unknown Position"  # Could be extracted from selected text
-        
-        # Create modification request
-        modification_request = ResumeModificationRequest(
-            job_description=request.selected_text,
-            job_title=job_title,
-            company_name=company_name,
-            customizations=ResumeCustomizations()
-        )
-        
-        # Use existing modification logic
-        return await modify_resume(modification_request, user_id)
-        
-    except Exception as e:
-        logger.error(f"Error in extension quick modify: {str(e)}", exc_info=True)
+    if user_id not in master_resumes_db:
         raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Failed to modify resume: {str(e)}"
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Please upload a master resume first"
         )
+    
+    # Extract company name and job title from URL or text
+    company_name = _company_from_url(request.page_url)
+    job_title = "Unknown Position"  # Could be extracted from selected text
+    
+    # Create modification request
+    modification_request = ResumeModificationRequest(
+        job_description=request.selected_text,
+        job_title=job_title,
+        company_name=company_name,
+        customizations=ResumeCustomizations()
+    )
+    
+    # Use existing modification logic, charged to the quick-modify quota only
+    return await _generate_modified_resume(modification_request, user_id)
 
 
 @router.get("/extension/status", response_model=ExtensionStatus)
@@ -623,12 +773,9 @@ async def get_extension_status(
     has_master_resume = user_id in master_resumes_db
     
     # Calculate remaining quota
-    key = f"{user_id}:quick-modify"
-    remaining_quota = 20  # Default
-    if key in rate_limits_db:
-        remaining_quota = max(0, 20 - rate_limits_db[key]["count"])
+    remaining_quota = int(_refill_bucket(user_id, "quick-modify", 20)[0])
     
-    return ExtensionStatus(
+    return ExtensionStatus.model_construct(
         is_authenticated=True,
         has_master_resume=has_master_resume,
         remaining_quota=remaining_quota,
@@ -638,43 +785,32 @@ async def get_extension_status(
 
 # 9. File Management
 @router.post("/files/temp-upload", response_model=TempFileUpload)
+@handle_errors("Failed to upload file")
 async def temp_file_upload(file: UploadFile = File(...)):
     """Temporary file upload for processing"""
-    try:
-        file_id = str(uuid.uuid4())
-        file_extension = Path(file.filename).suffix
-        temp_filename = f"temp_{file_id}{file_extension}"
-        temp_path = Path(settings.output_directory) / "temp" / temp_filename
-        
-        # Ensure directory exists
-        temp_path.parent.mkdir(parents=True, exist_ok=True)
-        
-        # Save file
-        async with aiofiles.open(temp_path, 'wb') as f:
-            content = await file.read()
-            await f.write(content)
-        
-        # Store temp file record
-        expires_at = datetime.utcnow() + timedelta(hours=24)
-        temp_files_db[file_id] = {
-            "file_path": str(temp_path),
-            "original_filename": file.filename,
-            "expires_at": expires_at
-        }
-        
-        return TempFileUpload(
-            file_id=file_id,
-            original_filename=file.filename,
-            upload_url=f"/api/files/download/{file_id}",
-            expires_at=expires_at
-        )
-        
-    except Exception as e:
-        logger.error(f"Error uploading temp file: {str(e)}", exc_info=True)
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Failed to upload file: {str(e)}"
-        )
+    file_id = str(uuid.uuid4())
+    file_extension = _file_extension(file.filename)
+    temp_filename = f"temp_{file_id}{file_extension}"
+    temp_path = TEMP_UPLOAD_DIR / temp_filename
+    
+    # Save file
+    await _save_upload(file, temp_path)
+    
+    # Store temp file record; expiry is kept as epoch seconds and only
+    # converted to a datetime for the response
+    expires_at = time.time() + TEMP_FILE_TTL_SECONDS
+    temp_files_db[file_id] = {
+        "file_path": str(temp_path),
+        "original_filename": file.filename,
+        "expires_at": expires_at
+    }
+    
+    return TempFileUpload(
+        file_id=file_id,
+        original_filename=file.filename,
+        upload_url=f"/api/files/download/{file_id}",
+        expires_at=datetime.utcfromtimestamp(expires_at)
+    )
 
 
 @router.get("/files/download/{file_id}")
@@ -686,15 +822,16 @@ async def download_file(
     # Check temp files first
     if file_id in temp_files_db:
         temp_file = temp_files_db[file_id]
-        if datetime.utcnow() > temp_file["expires_at"]:
+        if time.time() > temp_file["expires_at"]:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="File expired"
             )
         
-        return FileResponse(
+        return file_response(
             path=temp_file["file_path"],
-            filename=temp_file["original_filename"]
+            filename=temp_file["original_filename"],
+            stat_result=await stat_or_404(temp_file["file_path"])
         )
     
     # Check generated resumes
@@ -706,9 +843,10 @@ async def download_file(
                 detail="Access denied"
             )
         
-        return FileResponse(
+        return file_response(
             path=resume["file_path"],
-            filename=f"resume_{resume['company_name']}_{resume['job_title']}.pdf"
+            filename=f"resume_{resume['company_name']}_{resume['job_title']}.pdf",
+            stat_result=await stat_or_404(resume["file_path"])
         )
     
     raise HTTPException(
@@ -721,68 +859,56 @@ async def download_file(
 @router.get("/health", response_model=HealthResponse)
 async def health_check():
     """API health check"""
-    return HealthResponse(
-        status="healthy",
-        timestamp=datetime.utcnow(),
-        version=settings.version,
-        service_status={
-            "database": "connected",
-            "llm_service": "available",
-            "file_storage": "available"
-        }
-    )
+    global _health_body
+    second = int(time.time())
+    if second != _health_body[0]:
+        timestamp = datetime.utcfromtimestamp(second).isoformat().encode()
+        _health_body = (second, _HEALTH_JSON.replace(_HEALTH_TIMESTAMP, timestamp))
+    return Response(content=_health_body[1], media_type="application/json")
 
 
 @router.post("/parse-resume", response_model=ParsedResumeData)
+@handle_errors("Failed to parse resume")
 async def parse_resume(file: UploadFile = File(...)):
     """Parse uploaded resume into structured data"""
-    try:
-        # Validate file type
-        allowed_types = ["application/pdf", "application/vnd.openxmlformats-officedocument.wordprocessingml.document"]
-        if file.content_type not in allowed_types:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Only PDF and DOCX files are allowed"
-            )
-        
-        # Mock parsing (replace with actual parsing logic)
-        parsed_data = ParsedResumeData(
-            personal_info={
-                "name": "John Doe",
-                "email": "john.doe@example.com",
-                "phone": "+1-555-0123",
-                "location": "New York, NY"
-            },
-            experience=[
-                {
-                    "title": "Software Engineer",
-                    "company": "Tech Corp",
-                    "duration": "2021-2023",
-                    "description": "Developed web applications using Python and React"
-                }
-            ],
-            education=[
-                {
-                    "degree": "Bachelor of Science in Computer Science",
-                    "institution": "University of Technology",
-                    "year": "2021"
-                }
-            ],
-            skills=["Python", "JavaScript", "React", "FastAPI", "SQL"],
-            projects=[
-                {
-                    "name": "Resume Modifier",
-                    "description": "AI-powered resume customization tool",
-                    "technologies": ["Python", "FastAPI", "React"]
-                }
-            ]
-        )
-        
-        return parsed_data
-        
-    except Exception as e:
-        logger.error(f"Error parsing resume: {str(e)}", exc_info=True)
+    # Validate file type
+    if file.content_type not in ALLOWED_RESUME_TYPES:
         raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Failed to parse resume: {str(e)}"
-        ) 
\ No newline at end of file
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Only PDF and DOCX files are allowed"
+        )
+    
+    # Mock parsing (replace with actual parsing logic)
+    parsed_data = ParsedResumeData(
+        personal_info={
+            "name": "John Doe",
+            "email": "john.doe@example.com",
+            "phone": "+1-555-0123",
+            "location": "New York, NY"
+        },
+        experience=[
+            {
+                "title": "Software Engineer",
+                "company": "Tech Corp",
+                "duration": "2021-2023",
+                "description": "Developed web applications using Python and React"
+            }
+        ],
+        education=[
+            {
+                "degree": "Bachelor of Science in Computer Science",
+                "institution": "University of Technology",
+                "year": "2021"
+            }
+        ],
+        skills=["Python", "JavaScript", "React", "FastAPI", "SQL"],
+        projects=[
+            {
+                "name": "Resume Modifier",
+                "description": "AI-powered resume customization tool",
+                "technologies": ["Python", "FastAPI", "React"]
+            }
+        ]
+    )
+    
+    return parsed_data
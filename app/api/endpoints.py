@@ -1,23 +1,99 @@
 import logging
 import asyncio
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, Tuple
 from datetime import datetime
-import uuid
 import os
+import re
+import time
+import uuid
 
 from fastapi import APIRouter, HTTPException, UploadFile, File, Form
-from fastapi.responses import FileResponse
-from pydantic import BaseModel
+from fastapi.responses import Response, StreamingResponse
+from pydantic import BaseModel, ConfigDict
 
-from app.agents.graph import ResumeModifierAgent
+from app.agents import get_agent
+from app.api.responses import file_response
 from app.config import settings
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
+# Anything but letters, digits, spaces, '-' and '_' is dropped from download names
+_UNSAFE_FILENAME_CHARS = re.compile(r"[^\w \-]")
+
+
+def _filename_part(text: str) -> str:
+    return _UNSAFE_FILENAME_CHARS.sub("", text).rstrip()
+
+
+# Last line of a streamed resume whose run failed after the response started
+STREAM_ERROR_MARKER = "% RESUME-MODIFIER-ERROR:"
+
+
+# Agent outputs in order of preference: (result key, media type, X-PDF-Source, extension)
+_OUTPUT_FILES = (
+    ("pdf_file_rendercv", "application/pdf", "RenderCV", ".pdf"),
+    ("pdf_file_latex", "application/pdf", "LaTeX", ".pdf"),
+    ("tex_file", "application/x-latex", "LaTeX-Source", ".tex"),
+)
+
+
+async def _output_file_response(result: Dict[str, Any], request: "JobDescriptionRequest",
+                                      session_id: str, allow_tex: bool) -> Optional[Response]:
+    """Send the most preferred output file that exists; None if there is none"""
+    for key, media_type, source, extension in _OUTPUT_FILES:
+        path = result.get(key)
+        if not path or (extension == ".tex" and not allow_tex):
+            continue
+        try:
+            # One stat off the event loop, which the response reuses instead of its own
+            stat_result = await asyncio.to_thread(os.stat, path)
+        except FileNotFoundError:
+            continue
+        
+        headers = {
+            "X-Session-ID": session_id,
+            "X-Company": request.company_name,
+            "X-Position": request.position_title,
+            "X-PDF-Source": source
+        }
+        if extension == ".tex":
+            logger.warning("PDF compilation failed, returning LaTeX source file")
+            headers["X-Warning"] = "PDF compilation failed, returning LaTeX source"
+        else:
+            logger.info(f"Returning {source} PDF: {path}")
+        
+        company_safe = _filename_part(request.company_name)
+        position_safe = _filename_part(request.position_title)
+        return file_response(
+            path=path,
+            media_type=media_type,
+            filename=f"modified_resume_{company_safe}_{position_safe}_{session_id[:8]}{extension}",
+            headers=headers,
+            stat_result=stat_result
+        )
+    return None
+
+
+# (epoch second, datetime) of the last response timestamp handed out
+_now_cache: Tuple[int, Optional[datetime]] = (0, None)
+
+
+def _now() -> datetime:
+    """Current local time to the second, built at most once per second"""
+    global _now_cache
+    second = int(time.time())
+    if second != _now_cache[0]:
+        _now_cache = (second, datetime.fromtimestamp(second))
+    return _now_cache[1]
+
 
 class JobDescriptionRequest(BaseModel):
+    # Immutable, trimmed, and bounded before anything reaches the LLM
+    model_config = ConfigDict(frozen=True, extra='ignore', str_strip_whitespace=True,
+                              str_max_length=32_000)
+    
     job_description: str
     company_name: str
     position_title: str
@@ -36,7 +112,7 @@ async def health_check():
     """Health check endpoint"""
     return HealthResponse(
         status="healthy",
-        timestamp=datetime.now(),
+        timestamp=_now(),
         version=settings.version
     )
 
@@ -52,8 +128,8 @@ async def modify_resume(request: JobDescriptionRequest):
         
         logger.info(f"Starting resume modification for session {session_id}")
         
-        # Initialize the resume modifier agent
-        agent = ResumeModifierAgent()
+        # Shared resume modifier agent
+        agent = await get_agent()
         
         # Process the job description and modify the resume
         result = await agent.modify_resume(
@@ -64,61 +140,16 @@ async def modify_resume(request: JobDescriptionRequest):
             session_id=session_id
         )
         
-        # Create a sanitized filename for the PDF
-        company_safe = "".join(c for c in request.company_name if c.isalnum() or c in (' ', '-', '_')).rstrip()
-        position_safe = "".join(c for c in request.position_title if c.isalnum() or c in (' ', '-', '_')).rstrip()
-        filename = f"modified_resume_{company_safe}_{position_safe}_{session_id[:8]}.pdf"
-        
-        # Return RenderCV PDF file if available
-        if result.get("pdf_file_rendercv") and os.path.exists(result["pdf_file_rendercv"]):
-            logger.info(f"Returning RenderCV PDF: {result['pdf_file_rendercv']}")
-            return FileResponse(
-                path=result["pdf_file_rendercv"],
-                media_type='application/pdf',
-                filename=filename,
-                headers={
-                    "X-Session-ID": session_id,
-                    "X-Company": request.company_name,
-                    "X-Position": request.position_title,
-                    "X-PDF-Source": "RenderCV"
-                }
-            )
-        # Fallback to LaTeX PDF if available
-        elif result.get("pdf_file_latex") and os.path.exists(result["pdf_file_latex"]):
-            logger.info(f"Returning LaTeX PDF: {result['pdf_file_latex']}")
-            return FileResponse(
-                path=result["pdf_file_latex"],
-                media_type='application/pdf',
-                filename=filename,
-                headers={
-                    "X-Session-ID": session_id,
-                    "X-Company": request.company_name,
-                    "X-Position": request.position_title,
-                    "X-PDF-Source": "LaTeX"
-                }
-            )
-        # Fallback to LaTeX source file if PDF compilation failed
-        elif result.get("tex_file") and os.path.exists(result["tex_file"]):
-            logger.warning("PDF compilation failed, returning LaTeX source file")
-            tex_filename = f"modified_resume_{company_safe}_{position_safe}_{session_id[:8]}.tex"
-            return FileResponse(
-                path=result["tex_file"],
-                media_type='application/x-latex',
-                filename=tex_filename,
-                headers={
-                    "X-Session-ID": session_id,
-                    "X-Company": request.company_name,
-                    "X-Position": request.position_title,
-                    "X-Warning": "PDF compilation failed, returning LaTeX source",
-                    "X-PDF-Source": "LaTeX-Source"
-                }
-            )
-        else:
-            logger.error("No output file was generated")
-            raise HTTPException(
-                status_code=500,
-                detail="No output file was generated. Please check the logs for more details."
-            )
+        # Return the RenderCV PDF, else the LaTeX PDF, else the LaTeX source
+        response = await _output_file_response(result, request, session_id, allow_tex=True)
+        if response is not None:
+            return response
+        
+        logger.error("No output file was generated")
+        raise HTTPException(
+            status_code=500,
+            detail="No output file was generated. Please check the logs for more details."
+        )
         
     except Exception as e:
         logger.error(f"Error modifying resume: {str(e)}", exc_info=True)
@@ -128,6 +159,68 @@ async def modify_resume(request: JobDescriptionRequest):
         )
 
 
+@router.post("/modify-resume/stream")
+async def modify_resume_stream(request: JobDescriptionRequest):
+    """
+    Modify the resume based on job description input and stream the
+    modified LaTeX as it is generated. Output files are still written and
+    recorded in the session once the workflow finishes. If the run fails
+    after streaming has started, the body ends with a line starting with
+    STREAM_ERROR_MARKER and the document is incomplete.
+    """
+    session_id = request.session_id or str(uuid.uuid4())
+    
+    logger.info(f"Starting streamed resume modification for session {session_id}")
+    
+    # Shared resume modifier agent
+    agent = await get_agent()
+    
+    tokens = agent.stream_modified_resume(
+        job_description=request.job_description,
+        company_name=request.company_name,
+        position_title=request.position_title,
+        requirements=request.requirements,
+        session_id=session_id
+    )
+    
+    # The first token is awaited before responding, so a run that fails
+    # early (missing resume, LLM errors) still returns a 500
+    try:
+        first_token = await tokens.__anext__()
+    except StopAsyncIteration:
+        first_token = ""
+    except Exception as e:
+        logger.error(f"Error streaming resume modification: {str(e)}", exc_info=True)
+        raise HTTPException(
+            status_code=500,
+            detail=f"Failed to modify resume: {str(e)}"
+        )
+    
+    async def stream_latex():
+        try:
+            if first_token:
+                yield first_token
+            async for token in tokens:
+                yield token
+        except Exception as e:
+            # Headers have already been sent, so the failure is reported in
+            # the body: a final LaTeX comment line clients check for
+            logger.error(f"Error streaming resume modification: {str(e)}", exc_info=True)
+            yield f"\n{STREAM_ERROR_MARKER} {str(e)}\n"
+        finally:
+            await tokens.aclose()
+    
+    return StreamingResponse(
+        stream_latex(),
+        media_type='application/x-latex',
+        headers={
+            "X-Session-ID": session_id,
+            "X-Company": request.company_name,
+            "X-Position": request.position_title
+        }
+    )
+
+
 @router.post("/modify-resume-pdf")
 async def modify_resume_pdf_only(request: JobDescriptionRequest):
     """
@@ -140,8 +233,8 @@ async def modify_resume_pdf_only(request: JobDescriptionRequest):
         
         logger.info(f"Starting resume modification for PDF output for session {session_id}")
         
-        # Initialize the resume modifier agent
-        agent = ResumeModifierAgent()
+        # Shared resume modifier agent
+        agent = await get_agent()
         
         # Process the job description and modify the resume
         result = await agent.modify_resume(
@@ -152,44 +245,16 @@ async def modify_resume_pdf_only(request: JobDescriptionRequest):
             session_id=session_id
         )
         
-        # Create a sanitized filename for the PDF
-        company_safe = "".join(c for c in request.company_name if c.isalnum() or c in (' ', '-', '_')).rstrip()
-        position_safe = "".join(c for c in request.position_title if c.isalnum() or c in (' ', '-', '_')).rstrip()
-        filename = f"modified_resume_{company_safe}_{position_safe}_{session_id[:8]}.pdf"
-        
         # Only return PDF files, prioritizing RenderCV
-        if result.get("pdf_file_rendercv") and os.path.exists(result["pdf_file_rendercv"]):
-            logger.info(f"Returning RenderCV PDF: {result['pdf_file_rendercv']}")
-            return FileResponse(
-                path=result["pdf_file_rendercv"],
-                media_type='application/pdf',
-                filename=filename,
-                headers={
-                    "X-Session-ID": session_id,
-                    "X-Company": request.company_name,
-                    "X-Position": request.position_title,
-                    "X-PDF-Source": "RenderCV"
-                }
-            )
-        elif result.get("pdf_file_latex") and os.path.exists(result["pdf_file_latex"]):
-            logger.info(f"Returning LaTeX PDF: {result['pdf_file_latex']}")
-            return FileResponse(
-                path=result["pdf_file_latex"],
-                media_type='application/pdf',
-                filename=filename,
-                headers={
-                    "X-Session-ID": session_id,
-                    "X-Company": request.company_name,
-                    "X-Position": request.position_title,
-                    "X-PDF-Source": "LaTeX"
-                }
-            )
-        else:
-            logger.error("PDF generation failed for both RenderCV and LaTeX")
-            raise HTTPException(
-                status_code=500,
-                detail="PDF generation failed. Please try again or check the logs for more details."
-            )
+        response = await _output_file_response(result, request, session_id, allow_tex=False)
+        if response is not None:
+            return response
+        
+        logger.error("PDF generation failed for both RenderCV and LaTeX")
+        raise HTTPException(
+            status_code=500,
+            detail="PDF generation failed. Please try again or check the logs for more details."
+        )
         
     except Exception as e:
         logger.error(f"Error modifying resume for PDF: {str(e)}", exc_info=True)
@@ -205,13 +270,13 @@ async def get_session_history(session_id: str):
     Get modification history for a session
     """
     try:
-        agent = ResumeModifierAgent()
+        agent = await get_agent()
         history = await agent.get_session_history(session_id)
         
         return {
             "session_id": session_id,
             "history": history,
-            "timestamp": datetime.now()
+            "timestamp": _now()
         }
         
     except Exception as e:
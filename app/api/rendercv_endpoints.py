@@ -1,25 +1,37 @@
 """
 RenderCV API endpoints for generating professional PDF resumes
 """
+import asyncio
 import os
+import time
 import uuid
-import tempfile
-import subprocess
-import shutil
-from typing import Dict, Any, Optional
+import aiofiles
+from typing import Dict, Any, Optional, Tuple
 from datetime import datetime
+from importlib import metadata
 
 from fastapi import APIRouter, HTTPException, Form, File, UploadFile
-from fastapi.responses import FileResponse
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 
-from app.agents.graph import ResumeModifierAgent
+from app.agents import get_agent
+from app.api.responses import file_response, stat_or_404
 from app.config import settings
 
 router = APIRouter(prefix="/rendercv", tags=["rendercv"])
 
+# RenderCV documents are a few KB; anything far larger is not a resume
+MAX_YAML_UPLOAD_BYTES = 1024 * 1024
+
+# Health probes hit /health every few seconds; the RenderCV check is reused for this long
+HEALTH_CHECK_TTL_SECONDS = 30
+_health_cache: Optional[Tuple[float, Dict[str, Any]]] = None
+
 # Pydantic models for request/response
 class ResumeModificationRequest(BaseModel):
+    # Immutable, trimmed, and bounded before anything reaches the LLM
+    model_config = ConfigDict(frozen=True, extra='ignore', str_strip_whitespace=True,
+                              str_max_length=32_000)
+    
     job_description: str
     company_name: str
     position_title: str
@@ -35,8 +47,6 @@ class ResumeModificationResponse(BaseModel):
     pdf_file_rendercv: Optional[str] = None
     message: str
 
-# Initialize the resume modifier agent
-agent = ResumeModifierAgent()
 
 @router.post("/modify-resume", response_model=ResumeModificationResponse)
 async def modify_resume_with_rendercv(request: ResumeModificationRequest):
@@ -55,6 +65,7 @@ async def modify_resume_with_rendercv(request: ResumeModificationRequest):
         session_id = str(uuid.uuid4())
         
         # Modify resume using the agent
+        agent = await get_agent()
         result = await agent.modify_resume(
             job_description=request.job_description,
             company_name=request.company_name,
@@ -93,6 +104,7 @@ async def download_resume_file(session_id: str, file_type: str):
     """
     try:
         # Get session data
+        agent = await get_agent()
         session_data = await agent.get_session_history(session_id)
         
         if "message" in session_data:
@@ -122,13 +134,13 @@ async def download_resume_file(session_id: str, file_type: str):
         else:
             raise HTTPException(status_code=400, detail="Invalid file type")
         
-        if not file_path or not os.path.exists(file_path):
+        if not file_path:
             raise HTTPException(status_code=404, detail="File not found")
-        
-        return FileResponse(
+        return file_response(
             path=file_path,
             media_type=media_type,
-            filename=filename
+            filename=filename,
+            stat_result=await stat_or_404(file_path)
         )
         
     except HTTPException:
@@ -159,44 +171,24 @@ async def render_yaml_to_pdf(yaml_content: str = Form(...)):
         yaml_path = os.path.join(output_dir, yaml_file)
         pdf_path = os.path.join(output_dir, pdf_file)
         
-        # Save YAML content
-        with open(yaml_path, 'w', encoding='utf-8') as f:
-            f.write(yaml_content)
+        # Save YAML content without blocking the event loop
+        async with aiofiles.open(yaml_path, 'wb') as f:
+            await f.write(yaml_content.encode('utf-8'))
         
-        # Generate PDF using RenderCV
+        # Generate PDF using RenderCV, through the agent's cached renderer
         try:
-            with tempfile.TemporaryDirectory() as temp_dir:
-                # Copy YAML to temp directory
-                temp_yaml = os.path.join(temp_dir, "resume.yaml")
-                shutil.copy2(yaml_path, temp_yaml)
-                
-                # Run RenderCV
-                result = subprocess.run(
-                    ['rendercv', 'render', temp_yaml],
-                    capture_output=True,
-                    text=True,
-                    cwd=temp_dir
-                )
-                
-                if result.returncode != 0:
-                    raise Exception(f"RenderCV failed: {result.stderr}")
-                
-                # Find generated PDF
-                pdf_files = [f for f in os.listdir(temp_dir) if f.endswith('.pdf')]
-                if pdf_files:
-                    temp_pdf = os.path.join(temp_dir, pdf_files[0])
-                    shutil.copy2(temp_pdf, pdf_path)
-                else:
-                    raise Exception("PDF file was not generated")
+            agent = await get_agent()
+            await agent.render_yaml_to_pdf(yaml_content, pdf_path)
         
         except Exception as e:
             raise HTTPException(status_code=500, detail=f"RenderCV generation failed: {str(e)}")
         
         # Return PDF file
-        return FileResponse(
+        return file_response(
             path=pdf_path,
             media_type="application/pdf",
-            filename=f"resume_{session_id}.pdf"
+            filename=f"resume_{session_id}.pdf",
+            stat_result=await stat_or_404(pdf_path)
         )
         
     except HTTPException:
@@ -214,8 +206,11 @@ async def upload_yaml_and_render(yaml_file: UploadFile = File(...)):
         if not yaml_file.filename.endswith(('.yaml', '.yml')):
             raise HTTPException(status_code=400, detail="File must be a YAML file")
         
-        # Read YAML content
-        yaml_content = await yaml_file.read()
+        # Read YAML content; reading one byte past the cap bounds memory
+        # without trusting the client's declared size
+        yaml_content = await yaml_file.read(MAX_YAML_UPLOAD_BYTES + 1)
+        if len(yaml_content) > MAX_YAML_UPLOAD_BYTES:
+            raise HTTPException(status_code=413, detail="YAML file is too large")
         yaml_text = yaml_content.decode('utf-8')
         
         # Use the render-yaml endpoint functionality
@@ -232,6 +227,7 @@ async def get_session_info(session_id: str):
     Get information about a resume modification session
     """
     try:
+        agent = await get_agent()
         session_data = await agent.get_session_history(session_id)
         
         if "message" in session_data:
@@ -261,20 +257,46 @@ async def health_check():
     """
     Check if RenderCV is installed and working
     """
+    global _health_cache
+    now = time.monotonic()
+    if _health_cache is not None and now - _health_cache[0] < HEALTH_CHECK_TTL_SECONDS:
+        return _health_cache[1]
+    
+    result = await _check_rendercv()
+    _health_cache = (now, result)
+    return result
+
+
+async def _check_rendercv() -> Dict[str, Any]:
+    try:
+        # The installed package's metadata answers without forking the CLI
+        return {
+            "status": "healthy",
+            "rendercv_version": f"rendercv {metadata.version('rendercv')}",
+            "message": "RenderCV is installed and working"
+        }
+    except metadata.PackageNotFoundError:
+        pass
+    
     try:
         # Check if RenderCV is available
-        result = subprocess.run(['rendercv', '--version'], capture_output=True, text=True)
-        if result.returncode == 0:
+        proc = await asyncio.create_subprocess_exec(
+            'rendercv', '--version',
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE
+        )
+        stdout, stderr = await proc.communicate()
+        if proc.returncode == 0:
             return {
                 "status": "healthy",
-                "rendercv_version": result.stdout.strip(),
+                "rendercv_version": stdout.decode('utf-8', errors='replace').strip(),
                 "message": "RenderCV is installed and working"
             }
         else:
             return {
                 "status": "unhealthy",
                 "message": "RenderCV command failed",
-                "error": result.stderr
+                "error": stderr.decode('utf-8', errors='replace')
             }
     except FileNotFoundError:
         return {
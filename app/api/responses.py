@@ -0,0 +1,54 @@
+import asyncio
+import os
+from typing import Dict, Optional
+from urllib.parse import quote
+
+from fastapi import HTTPException, status
+from fastapi.responses import FileResponse, Response
+
+from app.config import settings
+
+
+async def stat_or_404(path: str) -> os.stat_result:
+    """Stat a file in a thread for file_response(); 404 if it is gone.
+
+    FileResponse skips its own stat when given the result, so a file deleted
+    after lookup fails here instead of after the 200 headers are sent.
+    """
+    try:
+        return await asyncio.to_thread(os.stat, path)
+    except FileNotFoundError:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="File not found"
+        )
+
+
+def file_response(
+    path: str,
+    media_type: Optional[str] = None,
+    filename: Optional[str] = None,
+    headers: Optional[Dict[str, str]] = None,
+    stat_result: Optional[os.stat_result] = None
+) -> Response:
+    """Send a file from the output directory.
+
+    Behind nginx (settings.x_accel_redirect_prefix set) the response only
+    carries an X-Accel-Redirect header and nginx sends the bytes itself;
+    otherwise, or for files outside the output directory, it is a plain
+    FileResponse streamed by the app.
+    """
+    response = FileResponse(path=path, media_type=media_type, filename=filename,
+                            headers=headers, stat_result=stat_result)
+    if not settings.x_accel_redirect_prefix:
+        return response
+
+    relative_path = os.path.relpath(os.path.abspath(path), os.path.abspath(settings.output_directory))
+    if relative_path.startswith(os.pardir):
+        return response
+
+    # Reuse FileResponse's Content-Type and Content-Disposition handling
+    redirect_headers = {name: value for name, value in response.headers.items()
+                        if name != "content-length"}
+    redirect_headers["X-Accel-Redirect"] = settings.x_accel_redirect_prefix.rstrip("/") + "/" + quote(relative_path)
+    return Response(headers=redirect_headers)
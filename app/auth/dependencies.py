@@ -1,7 +1,7 @@
 from fastapi import Depends, HTTPException, status, Header
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from typing import Optional
-from .jwt_handler import verify_token, get_user_id_from_token
+from .jwt_handler import JWT_FORMAT, verify_token, get_user_id_from_token
 
 security = HTTPBearer()
 
@@ -25,6 +25,8 @@ async def get_optional_user_id(
         return None
     
     token = authorization[7:]  # Remove "Bearer " prefix
+    if not JWT_FORMAT.fullmatch(token):
+        return None
     try:
         return get_user_id_from_token(token)
     except HTTPException:
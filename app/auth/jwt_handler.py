@@ -1,4 +1,7 @@
+import re
+import time
 import jwt
+from collections import OrderedDict
 from datetime import datetime, timedelta
 from typing import Optional, Dict, Any
 from fastapi import HTTPException, status
@@ -14,6 +17,13 @@ SECRET_KEY = settings.secret_key
 ALGORITHM = settings.jwt_algorithm
 ACCESS_TOKEN_EXPIRE_HOURS = settings.access_token_expire_hours
 
+# header.payload.signature, each base64url; anything else is rejected before any crypto
+JWT_FORMAT = re.compile(r"[A-Za-z0-9_-]+\.[A-Za-z0-9_-]+\.[A-Za-z0-9_-]+")
+
+# Verified tokens, so repeat requests skip signature checks until the token expires
+VERIFIED_TOKEN_CACHE_SIZE = 1024
+_verified_tokens: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()  # token -> payload
+
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify a password against its hash (bcrypt has a 72 byte limit)"""
@@ -49,15 +59,30 @@ def create_access_token(data: Dict[str, Any], expires_delta: Optional[timedelta]
 
 def verify_token(token: str) -> Dict[str, Any]:
     """Verify and decode a JWT token"""
+    payload = _verified_tokens.get(token)
+    if payload is not None:
+        if payload["exp"] > time.time():
+            _verified_tokens.move_to_end(token)
+            return dict(payload)
+        del _verified_tokens[token]
+    
     try:
+        if not JWT_FORMAT.fullmatch(token):
+            raise jwt.DecodeError("Malformed token")
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        return payload
     except jwt.PyJWTError:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Could not validate credentials",
             headers={"WWW-Authenticate": "Bearer"},
         )
+    
+    # Only tokens that expire are cached, so an entry never outlives its token
+    if isinstance(payload.get("exp"), (int, float)):
+        _verified_tokens[token] = dict(payload)
+        if len(_verified_tokens) > VERIFIED_TOKEN_CACHE_SIZE:
+            _verified_tokens.popitem(last=False)
+    return payload
 
 
 def get_user_id_from_token(token: str) -> str:
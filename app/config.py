@@ -1,27 +1,35 @@
-import os
-from typing import Optional
-from pydantic_settings import BaseSettings
+from functools import lru_cache
+from typing import List, Optional
+from pydantic_settings import BaseSettings, SettingsConfigDict
 from dotenv import load_dotenv
 
+# Also export .env to os.environ for libraries that read it directly
+# (e.g. LangChain tracing); the fields below are resolved by BaseSettings
 load_dotenv()
 
 
 class Settings(BaseSettings):
+    # .env may carry variables meant for other libraries (see load_dotenv above)
+    model_config = SettingsConfigDict(env_file=".env", extra="ignore")
+    
     # API Configuration
     app_name: str = "Resume Modifier Backend"
     version: str = "1.0.0"
     debug: bool = False
     host: str = "0.0.0.0"
     port: int = 8000
+    # Origins allowed to call the API from a browser, e.g.
+    # CORS_ORIGINS='["chrome-extension://<extension id>", "https://app.example.com"]'
+    cors_origins: List[str] = ["*"]
     
     # Security Configuration
-    secret_key: str = os.getenv("SECRET_KEY", "your-secret-key-change-in-production-please")
+    secret_key: str = "your-secret-key-change-in-production-please"
     jwt_algorithm: str = "HS256"
     access_token_expire_hours: int = 24
     
     # LLM Configuration
-    openai_api_key: Optional[str] = os.getenv("OPENAI_API_KEY")
-    anthropic_api_key: Optional[str] = os.getenv("ANTHROPIC_API_KEY")
+    openai_api_key: Optional[str] = None
+    anthropic_api_key: Optional[str] = None
     openai_model: str = "gpt-4o"
     anthropic_model: str = "claude-sonnet-4-20250514"
 
@@ -34,15 +42,26 @@ class Settings(BaseSettings):
     # Session Management
     session_ttl: int = 3600  # 1 hour
     max_session_memory: int = 50  # Maximum messages per session
+    session_cache_size: int = 1024  # Agent sessions kept before evicting the least recently used
     
     # PDF Processing
     pdf_directory: str = "./pdf"
     cv_directory: str = "./cv"
     output_directory: str = "./output"
+    # Internal nginx location aliasing output_directory, e.g. "/_protected_output/";
+    # when set, files are handed to nginx via X-Accel-Redirect instead of streamed
+    x_accel_redirect_prefix: Optional[str] = None
     
     # Agent Configuration
     max_iterations: int = 10
     agent_timeout: int = 60
+    result_cache_size: int = 128  # Completed modifications kept for identical requests
+    disk_cache_ttl: int = 7 * 24 * 3600  # Cached PDFs and persisted results kept on disk (1 week)
+    llm_cache_size: int = 256  # Prompt/response pairs cached for identical LLM calls
+    llm_max_retries: int = 4  # Retries for transient Anthropic errors (rate limits, overload)
+    
+    # User accounts, appended as JSON lines and reloaded at startup
+    users_file: str = "./data/users.jsonl"
     
     # ChromaDB Configuration
     chroma_persist_directory: str = "./chroma_db"
@@ -51,9 +70,12 @@ class Settings(BaseSettings):
     rate_limit_modify_resume: int = 10  # per hour
     rate_limit_quick_modify: int = 20  # per hour
     rate_limit_general: int = 100  # per hour
-    
-    class Config:
-        env_file = ".env"
 
 
-settings = Settings() 
\ No newline at end of file
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    """Return the process-wide settings, read from the environment once"""
+    return Settings()
+
+
+settings = get_settings() 
\ No newline at end of file
@@ -1,6 +1,6 @@
 from datetime import datetime
 from typing import Optional, List, Dict, Any, Union
-from pydantic import BaseModel, EmailStr, Field
+from pydantic import BaseModel, ConfigDict, EmailStr, Field
 from enum import Enum
 
 
@@ -58,13 +58,28 @@ class JobAnalysisRequest(BaseModel):
     job_url: Optional[str] = None
 
 
+class ExtractedRequirements(BaseModel):
+    model_config = ConfigDict(extra='ignore', frozen=True)
+    
+    technical_skills: List[str] = []
+    soft_skills: List[str] = []
+    years_experience: Optional[str] = None
+
+
+class AnalysisMetadata(BaseModel):
+    model_config = ConfigDict(extra='ignore', frozen=True)
+    
+    confidence_score: float
+    analysis_timestamp: datetime
+
+
 class JobAnalysisResponse(BaseModel):
     keywords: List[str]
     required_skills: List[str]
     experience_level: str
     industry_focus: str
-    extracted_requirements: Dict[str, Any]
-    analysis_metadata: Dict[str, Any]
+    extracted_requirements: ExtractedRequirements
+    analysis_metadata: AnalysisMetadata
 
 
 # Resume Modification Models
@@ -82,18 +97,29 @@ class ResumeCustomizations(BaseModel):
 
 
 class ResumeModificationRequest(BaseModel):
+    # Immutable, trimmed, and bounded before anything reaches the LLM
+    model_config = ConfigDict(frozen=True, extra='ignore', str_strip_whitespace=True,
+                              str_max_length=32_000)
+    
     job_description: str
     job_title: str
     company_name: str
     customizations: Optional[ResumeCustomizations] = None
 
 
+class PreviewMetadata(BaseModel):
+    model_config = ConfigDict(extra='ignore', frozen=True)
+    
+    analysis_timestamp: datetime
+    confidence: float
+
+
 class ResumeModificationPreview(BaseModel):
-    proposed_changes: Dict[str, Any]
+    proposed_changes: Dict[str, str]  # section -> description of the change
     sections_to_modify: List[str]
     skills_to_emphasize: List[str]
     estimated_match_score: float
-    preview_metadata: Dict[str, Any]
+    preview_metadata: PreviewMetadata
 
 
 class GeneratedResume(BaseModel):
@@ -164,6 +190,9 @@ class QuickSettings(BaseModel):
 
 
 class ExtensionQuickModifyRequest(BaseModel):
+    # Same bounds as ResumeModificationRequest, which is built from selected_text
+    model_config = ConfigDict(str_strip_whitespace=True, str_max_length=32_000)
+    
     selected_text: str
     page_url: str
     quick_settings: Optional[QuickSettings] = None
@@ -199,13 +228,55 @@ class HealthResponse(BaseModel):
     service_status: Dict[str, str]
 
 
+class PersonalInfo(BaseModel):
+    model_config = ConfigDict(extra='ignore', frozen=True)
+    
+    name: str
+    email: Optional[EmailStr] = None
+    phone: Optional[str] = None
+    location: Optional[str] = None
+
+
+class ExperienceItem(BaseModel):
+    model_config = ConfigDict(extra='ignore', frozen=True)
+    
+    title: str
+    company: str
+    duration: Optional[str] = None
+    description: Optional[str] = None
+
+
+class EducationItem(BaseModel):
+    model_config = ConfigDict(extra='ignore', frozen=True)
+    
+    degree: str
+    institution: str
+    year: Optional[str] = None
+
+
+class ProjectItem(BaseModel):
+    model_config = ConfigDict(extra='ignore', frozen=True)
+    
+    name: str
+    description: Optional[str] = None
+    technologies: List[str] = []
+
+
+class CertificationItem(BaseModel):
+    model_config = ConfigDict(extra='ignore', frozen=True)
+    
+    name: str
+    issuer: Optional[str] = None
+    year: Optional[str] = None
+
+
 class ParsedResumeData(BaseModel):
-    personal_info: Dict[str, Any]
-    experience: List[Dict[str, Any]]
-    education: List[Dict[str, Any]]
+    personal_info: PersonalInfo
+    experience: List[ExperienceItem]
+    education: List[EducationItem]
     skills: List[str]
-    projects: Optional[List[Dict[str, Any]]] = None
-    certifications: Optional[List[Dict[str, Any]]] = None
+    projects: Optional[List[ProjectItem]] = None
+    certifications: Optional[List[CertificationItem]] = None
     additional_sections: Optional[Dict[str, Any]] = None
 
 
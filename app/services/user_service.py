@@ -1,15 +1,101 @@
+import asyncio
+import logging
+import os
 import uuid
+import orjson
 from datetime import datetime
+from functools import lru_cache
 from typing import Optional, Dict, Any
 from fastapi import HTTPException, status
 
 from app.models.schemas import UserRegistration, UserLogin, UserProfile, AuthToken
 from app.auth.jwt_handler import verify_password, get_password_hash, create_access_token
+from app.config import settings
 
+logger = logging.getLogger(__name__)
 
-# In-memory storage (replace with database in production)
-users_db: Dict[str, Dict[str, Any]] = {}
-users_by_email: Dict[str, str] = {}
+# In-memory storage (replace with database in production); both indexes
+# hold the same record dicts, so login needs a single lookup
+users_db: Dict[str, Dict[str, Any]] = {}  # id -> record
+users_by_email: Dict[str, Dict[str, Any]] = {}  # casefolded email -> record
+
+# Held while appending to settings.users_file, so records land in call order
+_users_file_lock = asyncio.Lock()
+
+
+def load_users() -> None:
+    """Rebuild the in-memory indexes from settings.users_file, a JSON-lines log
+    of user records where the last line for an id wins"""
+    os.makedirs(os.path.dirname(settings.users_file) or ".", exist_ok=True)
+    try:
+        with open(settings.users_file, "r+b") as f:
+            lines = f.readlines()
+            # A crash mid-append leaves a torn last line; cut it off so the
+            # next append starts on a fresh line
+            if lines and not lines[-1].endswith(b"\n"):
+                logger.warning(f"Dropping a partially written user record in {settings.users_file}")
+                f.truncate(f.tell() - len(lines.pop()))
+    except FileNotFoundError:
+        return
+    
+    for line in lines:
+        try:
+            user_record = orjson.loads(line)
+            user_record["created_at"] = datetime.fromisoformat(user_record["created_at"])
+            user_record["updated_at"] = datetime.fromisoformat(user_record["updated_at"])
+            user_id = user_record["id"]
+            email_key = user_record["email"].casefold()
+        except (orjson.JSONDecodeError, KeyError, TypeError, ValueError, AttributeError):
+            logger.warning(f"Skipping unreadable line in {settings.users_file}")
+            continue
+        users_db[user_id] = user_record
+        # Accounts registered before emails were casefolded may differ only by
+        # case; the first one keeps the email, the others stay loaded by id
+        indexed = users_by_email.get(email_key)
+        if indexed is not None and indexed["id"] != user_id:
+            logger.warning(f"User {user_id} shares email {user_record['email']!r} with user "
+                           f"{indexed['id']} up to case; only the latter can log in by email")
+            continue
+        users_by_email[email_key] = user_record
+    logger.info(f"Loaded {len(users_db)} users from {settings.users_file}")
+
+
+def _append_user(user_record: Dict[str, Any]) -> None:
+    """Append a user record to the users log and flush it to disk"""
+    with open(settings.users_file, "ab") as f:
+        f.write(orjson.dumps(user_record) + b"\n")
+        f.flush()
+        os.fsync(f.fileno())
+
+
+async def _persist_user(user_record: Dict[str, Any]) -> None:
+    """Record a new or updated user durably; the in-memory indexes stay authoritative"""
+    snapshot = dict(user_record)
+    try:
+        async with _users_file_lock:
+            await asyncio.to_thread(_append_user, snapshot)
+    except OSError as e:
+        logger.error(f"Could not persist user {user_record['id']}: {str(e)}")
+
+
+@lru_cache(maxsize=1)
+def _dummy_password_hash() -> str:
+    """Hash checked for unknown emails, so they cost as much bcrypt work as known ones"""
+    # Built on first login rather than at import: bcrypt is deliberately slow
+    return get_password_hash(uuid.uuid4().hex)
+
+
+def _user_profile(user_record: Dict[str, Any]) -> UserProfile:
+    """Profile of a stored user record"""
+    # Records were validated at registration, so the profile skips validation
+    return UserProfile.model_construct(
+        id=user_record["id"],
+        email=user_record["email"],
+        full_name=user_record["full_name"],
+        created_at=user_record["created_at"],
+        updated_at=user_record["updated_at"],
+        is_active=user_record["is_active"]
+    )
 
 
 class UserService:
@@ -18,8 +104,11 @@ class UserService:
     @staticmethod
     async def register_user(user_data: UserRegistration) -> AuthToken:
         """Register a new user"""
+        # Emails are matched case-insensitively; the record keeps the original
+        email_key = user_data.email.casefold()
+        
         # Check if user already exists
-        if user_data.email in users_by_email:
+        if email_key in users_by_email:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Email already registered"
@@ -27,32 +116,33 @@ class UserService:
         
         # Create new user
         user_id = str(uuid.uuid4())
-        hashed_password = get_password_hash(user_data.password)
+        # bcrypt takes hundreds of milliseconds, so it runs off the event loop
+        hashed_password = await asyncio.to_thread(get_password_hash, user_data.password)
+        now = datetime.utcnow()
         
         user_record = {
             "id": user_id,
             "email": user_data.email,
             "full_name": user_data.full_name,
             "hashed_password": hashed_password,
-            "created_at": datetime.utcnow(),
-            "updated_at": datetime.utcnow(),
+            "created_at": now,
+            "updated_at": now,
             "is_active": True
         }
         
+        # A concurrent registration may have claimed the email while hashing
+        if users_by_email.setdefault(email_key, user_record) is not user_record:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Email already registered"
+            )
         users_db[user_id] = user_record
-        users_by_email[user_data.email] = user_id
+        await _persist_user(user_record)
         
         # Create access token
         access_token = create_access_token(data={"sub": user_id, "email": user_data.email})
         
-        user_profile = UserProfile(
-            id=user_id,
-            email=user_data.email,
-            full_name=user_data.full_name,
-            created_at=user_record["created_at"],
-            updated_at=user_record["updated_at"],
-            is_active=True
-        )
+        user_profile = _user_profile(user_record)
         
         return AuthToken(
             access_token=access_token,
@@ -63,24 +153,23 @@ class UserService:
     @staticmethod
     async def login_user(login_data: UserLogin) -> AuthToken:
         """Login user and return access token"""
-        # Find user by email
-        if login_data.email not in users_by_email:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Invalid email or password"
-            )
-        
-        user_id = users_by_email[login_data.email]
-        user_record = users_db[user_id]
-        
-        # Verify password
-        if not verify_password(login_data.password, user_record["hashed_password"]):
+        # Find user by email; an unknown one is still checked against a
+        # password hash, so response time doesn't reveal which emails exist
+        user_record = users_by_email.get(login_data.email.casefold())
+        if user_record:
+            hashed_password = user_record["hashed_password"]
+        else:
+            hashed_password = await asyncio.to_thread(_dummy_password_hash)
+        
+        # Verify password; bcrypt runs off the event loop
+        password_ok = await asyncio.to_thread(verify_password, login_data.password, hashed_password)
+        if (user_record is None) | (not password_ok):
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Invalid email or password"
             )
         
-        # Check if user is active
+        # Check if user is active; only reachable with the right password
         if not user_record.get("is_active", True):
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
@@ -88,18 +177,12 @@ class UserService:
             )
         
         # Create access token
+        user_id = user_record["id"]
         access_token = create_access_token(
             data={"sub": user_id, "email": login_data.email}
         )
         
-        user_profile = UserProfile(
-            id=user_id,
-            email=user_record["email"],
-            full_name=user_record["full_name"],
-            created_at=user_record["created_at"],
-            updated_at=user_record["updated_at"],
-            is_active=user_record["is_active"]
-        )
+        user_profile = _user_profile(user_record)
         
         return AuthToken(
             access_token=access_token,
@@ -108,7 +191,7 @@ class UserService:
         )
     
     @staticmethod
-    async def get_user_profile(user_id: str) -> UserProfile:
+    def get_user_profile(user_id: str) -> UserProfile:
         """Get user profile by ID"""
         if user_id not in users_db:
             raise HTTPException(
@@ -117,14 +200,7 @@ class UserService:
             )
         
         user_record = users_db[user_id]
-        return UserProfile(
-            id=user_id,
-            email=user_record["email"],
-            full_name=user_record["full_name"],
-            created_at=user_record["created_at"],
-            updated_at=user_record["updated_at"],
-            is_active=user_record["is_active"]
-        )
+        return _user_profile(user_record)
     
     @staticmethod
     async def update_user_profile(user_id: str, update_data: Dict[str, Any]) -> UserProfile:
@@ -142,12 +218,6 @@ class UserService:
             user_record["full_name"] = update_data["full_name"]
         
         user_record["updated_at"] = datetime.utcnow()
+        await _persist_user(user_record)
         
-        return UserProfile(
-            id=user_id,
-            email=user_record["email"],
-            full_name=user_record["full_name"],
-            created_at=user_record["created_at"],
-            updated_at=user_record["updated_at"],
-            is_active=user_record["is_active"]
-        ) 
\ No newline at end of file
+        return _user_profile(user_record) 
\ No newline at end of file
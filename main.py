@@ -1,17 +1,21 @@
+import asyncio
 import logging
+import math
 import os
+import time
 from contextlib import asynccontextmanager
-from typing import Optional
+from typing import Dict, Optional, Tuple
 
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, ORJSONResponse
 import uvicorn
 
 from app.config import settings
 from app.api.endpoints import router as api_router
 from app.api.rendercv_endpoints import router as rendercv_router
-from app.api.comprehensive_api import router as comprehensive_router
+from app.api.comprehensive_api import router as comprehensive_router, run_file_deleter, run_temp_file_sweeper
+from app.services.user_service import load_users
 
 # Configure logging
 logging.basicConfig(
@@ -36,12 +40,22 @@ async def lifespan(app: FastAPI):
     os.makedirs(settings.chroma_persist_directory, exist_ok=True)
     os.makedirs("./data", exist_ok=True)
     
+    # Restore user accounts registered before the last restart
+    load_users()
+    
+    # Delete expired temp uploads in the background
+    temp_file_sweeper = asyncio.create_task(run_temp_file_sweeper())
+    # Unlink files of deleted resumes off the request path
+    file_deleter = asyncio.create_task(run_file_deleter())
+    
     logger.info("Application startup complete")
     
     yield
     
     # Shutdown
     logger.info("Shutting down Resume Modifier Backend")
+    temp_file_sweeper.cancel()
+    file_deleter.cancel()
 
 
 # Create FastAPI application
@@ -56,16 +70,18 @@ app = FastAPI(
     
     The system uses LangGraph to orchestrate multiple specialized agents for optimal responses.
     """,
-    lifespan=lifespan
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse
 )
 
 # Add CORS middleware
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=["*"],  # Configure appropriately for production
+    allow_origins=settings.cors_origins,  # Set CORS_ORIGINS in production
     allow_credentials=True,
     allow_methods=["*"],
-    allow_headers=["*"],
+    # Headers the Chrome extension and web clients send
+    allow_headers=["Authorization", "Content-Type", "X-Extension-Version"],
 )
 
 # Include API routes
@@ -86,10 +102,33 @@ async def root():
     }
 
 
+# A traceback is logged once per raising line and exception type in this
+# window; repeats log one line, so an error storm doesn't format a trace each
+TRACEBACK_LOG_INTERVAL_SECONDS = 60
+_traceback_logged_at: Dict[Tuple[str, str, int], float] = {}  # fingerprint -> monotonic time
+
+
+def _should_log_traceback(exc: Exception) -> bool:
+    tb = exc.__traceback__
+    while tb is not None and tb.tb_next is not None:
+        tb = tb.tb_next
+    if tb is None:
+        return True
+    fingerprint = (type(exc).__name__, tb.tb_frame.f_code.co_filename, tb.tb_lineno)
+    
+    now = time.monotonic()
+    if now - _traceback_logged_at.get(fingerprint, -math.inf) < TRACEBACK_LOG_INTERVAL_SECONDS:
+        return False
+    if len(_traceback_logged_at) >= 1024:
+        _traceback_logged_at.clear()
+    _traceback_logged_at[fingerprint] = now
+    return True
+
+
 @app.exception_handler(Exception)
 async def global_exception_handler(request: Request, exc: Exception):
     """Global exception handler"""
-    logger.error(f"Global exception: {exc}", exc_info=True)
+    logger.error(f"Global exception: {exc}", exc_info=_should_log_traceback(exc))
     return JSONResponse(
         status_code=500,
         content={
@@ -5,59 +5,162 @@ This script tests all major database operations and storage functionality.
 """
 
 import os
-import json
-import tempfile
-from datetime import datetime
-from supabase import create_client, Client
-from dotenv import load_dotenv
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import TYPE_CHECKING, Optional
+
+# supabase pulls in httpx, gotrue, postgrest and storage3; it is imported
+# when the first client is built, not when this module is imported
+if TYPE_CHECKING:
+    from supabase import Client
+
+log = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True, slots=True)
+class SupabaseTestConfig:
+    """Credentials for the test run, read from the environment"""
+    url: str
+    key: str
+    email: Optional[str]
+    password: Optional[str]
+
+
+@lru_cache(maxsize=1)
+def _get_config() -> SupabaseTestConfig:
+    """Read and validate the Supabase settings once per process"""
+    from dotenv import load_dotenv
+    
+    # Load environment variables
+    load_dotenv()
+    
+    url = os.getenv('SUPABASE_URL')
+    key = os.getenv('SUPABASE_ANON_KEY')
+    if not url or not key:
+        raise ValueError("Please set SUPABASE_URL and SUPABASE_ANON_KEY environment variables")
+    return SupabaseTestConfig(url, key, os.getenv('SUPABASE_EMAIL'), os.getenv('SUPABASE_PASSWORD'))
+
+
+@lru_cache(maxsize=1)
+def _get_client(url: str, key: str) -> "Client":
+    """One Supabase client per process, so every suite shares its HTTP connections"""
+    from supabase import create_client
+    from supabase.lib.client_options import ClientOptions
+    
+    return create_client(url, key, options=ClientOptions(
+        postgrest_client_timeout=10,
+        storage_client_timeout=30
+    ))
+
+
+# Minimal one-page PDF uploaded by the storage test (just text for testing;
+# a real resume would come from a PDF library like reportlab)
+TEST_PDF_BYTES = b"""%PDF-1.4
+1 0 obj
+<< /Type /Catalog /Pages 2 0 R >>
+endobj
+2 0 obj
+<< /Type /Pages /Kids [3 0 R] /Count 1 >>
+endobj
+3 0 obj
+<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Contents 4 0 R >>
+endobj
+4 0 obj
+<< /Length 44 >>
+stream
+BT
+/F1 12 Tf
+100 700 Td
+(Test Resume PDF) Tj
+ET
+endstream
+endobj
+xref
+0 5
+0000000000 65535 f 
+0000000009 00000 n 
+0000000058 00000 n 
+0000000115 00000 n 
+0000000206 00000 n 
+trailer
+<< /Size 5 /Root 1 0 R >>
+startxref
+290
+%%EOF"""
+
+
+# Fixture payloads for the master and generated resume records; built once
+# at import rather than on every test run
+MASTER_RESUME_STRUCTURED_DATA = {
+    "personal_info": {
+        "name": "Test User",
+        "email": "test@example.com",
+        "phone": "+1234567890"
+    },
+    "experience": [
+        {
+            "title": "Software Developer",
+            "company": "Tech Corp",
+            "duration": "2020-2023",
+            "description": "Developed web applications"
+        }
+    ],
+    "skills": ["Python", "JavaScript", "React", "SQL"],
+    "education": [
+        {
+            "degree": "Computer Science",
+            "university": "Tech University",
+            "year": "2020"
+        }
+    ]
+}
+
+GENERATED_RESUME_MODIFICATIONS = {
+    "emphasized_skills": ["Python", "Machine Learning", "Cloud Computing"],
+    "reordered_sections": ["experience", "skills", "projects", "education"],
+    "added_keywords": ["scalable", "distributed systems", "API development"],
+    "template_used": "modern"
+}
 
-# Load environment variables
-load_dotenv()
 
 class SupabaseTestSuite:
     def __init__(self):
         """Initialize Supabase client with your credentials"""
-        print("early")
-        self.supabase_url = os.getenv('SUPABASE_URL')
-        self.supabase_key = os.getenv('SUPABASE_ANON_KEY')
-        
-        if not self.supabase_url or not self.supabase_key:
-            raise ValueError("Please set SUPABASE_URL and SUPABASE_ANON_KEY environment variables")
+        config = _get_config()
+        self.supabase_url = config.url
+        self.supabase_key = config.key
         
-        print("create client")
-        print(self.supabase_url)
-        print(self.supabase_key)
-        
-        self.supabase: Client = create_client(self.supabase_url, self.supabase_key)
-        print("test user")
+        self.supabase: "Client" = _get_client(self.supabase_url, self.supabase_key)
         self.test_user = None
-        self.test_email = os.getenv('SUPABASE_EMAIL')
-        self.test_password = os.getenv('SUPABASE_PASSWORD')
-        print("HERE")
+        self.generated_resume_id = None
+        self.test_email = config.email
+        self.test_password = config.password
         
-        print(f"🚀 Initializing tests with Supabase URL: {self.supabase_url}")
-        print(f"📧 Test email: {self.test_email}")
-        print("=" * 60)
+        log.info("🚀 Initializing tests with Supabase URL: %s", self.supabase_url)
+        log.info("📧 Test email: %s", self.test_email)
+        log.info("=" * 60)
 
     def test_1_connection(self):
         """Test basic connection to Supabase"""
-        print("\n1️⃣ Testing database connection...")
+        log.info("\n1️⃣ Testing database connection...")
         try:
             # Test by fetching resume templates
             response = self.supabase.table('resume_templates').select('*').execute()
-            print(f"✅ Connection successful! Found {len(response.data)} resume templates")
+            log.info("✅ Connection successful! Found %d resume templates", len(response.data))
             
             # Display templates
-            for template in response.data:
-                print(f"   - {template['name']}: {template['description']}")
+            if response.data and log.isEnabledFor(logging.INFO):
+                log.info("\n".join(f"   - {template['name']}: {template['description']}" for template in response.data))
             return True
         except Exception as e:
-            print(f"❌ Connection failed: {str(e)}")
+            log.error("❌ Connection failed: %s", e)
             return False
 
     def test_2_user_registration(self):
         """Test user registration"""
-        print("\n2️⃣ Testing user registration...")
+        log.info("\n2️⃣ Testing user registration...")
         try:
             # Register new user
             auth_response = self.supabase.auth.sign_up({
@@ -67,9 +170,9 @@ class SupabaseTestSuite:
             
             if auth_response.user:
                 self.test_user = auth_response.user
-                print(f"✅ User registered successfully!")
-                print(f"   User ID: {self.test_user.id}")
-                print(f"   Email: {self.test_user.email}")
+                log.info("✅ User registered successfully!")
+                log.info("   User ID: %s", self.test_user.id)
+                log.info("   Email: %s", self.test_user.email)
 
                 # Create user profile
                 try:
@@ -79,29 +182,38 @@ class SupabaseTestSuite:
                     }
 
                     profile_response = self.supabase.table('user_profiles').insert(profile_data).execute()
-                    print("✅ User profile created!")
+                    log.info("✅ User profile created!")
                 except Exception as profile_error:
                     # Check if profile already exists
                     existing_profile = self.supabase.table('user_profiles').select('*').eq('id', self.test_user.id).execute()
                     if existing_profile.data:
-                        print("✅ User profile already exists (skipping creation)")
+                        log.info("✅ User profile already exists (skipping creation)")
                     else:
-                        print(f"⚠️  Could not create user profile: {str(profile_error)}")
-                        print("   This may be due to RLS policies. Please check your Supabase policies.")
+                        log.warning("⚠️  Could not create user profile: %s", profile_error)
+                        log.info("   This may be due to RLS policies. Please check your Supabase policies.")
 
                 return True
             else:
-                print("❌ User registration failed: No user returned")
+                log.error("❌ User registration failed: No user returned")
                 return False
                 
         except Exception as e:
-            print(f"❌ User registration failed: {str(e)}")
+            log.error("❌ User registration failed: %s", e)
             return False
 
     def test_3_user_login(self):
         """Test user login"""
-        print("\n3️⃣ Testing user login...")
+        log.info("\n3️⃣ Testing user login...")
         try:
+            # sign_up already signs in when email confirmation is off; reuse
+            # that session instead of a second auth round-trip
+            session = self.supabase.auth.get_session()
+            if session and session.user and session.user.email == self.test_email:
+                self.test_user = session.user
+                log.info("✅ User login successful! (reusing the registration session)")
+                log.info("   Access token: %s...", session.access_token[:20])
+                return True
+            
             # Sign in with the test user
             auth_response = self.supabase.auth.sign_in_with_password({
                 "email": self.test_email,
@@ -110,23 +222,23 @@ class SupabaseTestSuite:
             
             if auth_response.user:
                 self.test_user = auth_response.user
-                print("✅ User login successful!")
-                print(f"   Access token: {auth_response.session.access_token[:20]}...")
+                log.info("✅ User login successful!")
+                log.info("   Access token: %s...", auth_response.session.access_token[:20])
                 return True
             else:
-                print("❌ User login failed")
+                log.error("❌ User login failed")
                 return False
                 
         except Exception as e:
-            print(f"❌ User login failed: {str(e)}")
+            log.error("❌ User login failed: %s", e)
             return False
 
     def test_4_user_preferences(self):
         """Test user preferences operations"""
-        print("\n4️⃣ Testing user preferences...")
+        log.info("\n4️⃣ Testing user preferences...")
         try:
             if not self.test_user:
-                print("❌ No authenticated user available")
+                log.error("❌ No authenticated user available")
                 return False
             
             # Insert user preferences
@@ -138,147 +250,87 @@ class SupabaseTestSuite:
                 "color_scheme": "blue"
             }
             
+            # PostgREST returns the inserted row, so no separate fetch is needed
             insert_response = self.supabase.table('user_preferences').insert(preferences_data).execute()
-            print("✅ User preferences inserted!")
-            
-            # Fetch user preferences
-            fetch_response = self.supabase.table('user_preferences').select('*').eq('user_id', self.test_user.id).execute()
-            
-            if fetch_response.data:
-                prefs = fetch_response.data[0]
-                print(f"✅ Preferences retrieved!")
-                print(f"   Template: {prefs['default_template']}")
-                print(f"   Tone: {prefs['default_tone']}")
-                print(f"   Sections: {prefs['always_include_sections']}")
+            log.info("✅ User preferences inserted!")
+            
+            if insert_response.data:
+                prefs = insert_response.data[0]
+                log.info("✅ Preferences retrieved!")
+                log.info("   Template: %s", prefs['default_template'])
+                log.info("   Tone: %s", prefs['default_tone'])
+                log.info("   Sections: %s", prefs['always_include_sections'])
                 
                 # Update preferences
                 update_data = {"color_scheme": "green"}
                 update_response = self.supabase.table('user_preferences').update(update_data).eq('user_id', self.test_user.id).execute()
-                print("✅ Preferences updated!")
+                log.info("✅ Preferences updated!")
                 
                 return True
             else:
-                print("❌ Could not retrieve preferences")
+                log.error("❌ Could not retrieve preferences")
                 return False
                 
         except Exception as e:
-            print(f"❌ User preferences test failed: {str(e)}")
+            log.error("❌ User preferences test failed: %s", e)
             return False
 
-    def create_test_pdf(self):
-        """Create a simple test PDF file"""
-        try:
-            # Create a simple PDF content (this is just text for testing)
-            # In real implementation, you'd use a proper PDF library like reportlab
-            pdf_content = b"""%PDF-1.4
-1 0 obj
-<< /Type /Catalog /Pages 2 0 R >>
-endobj
-2 0 obj
-<< /Type /Pages /Kids [3 0 R] /Count 1 >>
-endobj
-3 0 obj
-<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Contents 4 0 R >>
-endobj
-4 0 obj
-<< /Length 44 >>
-stream
-BT
-/F1 12 Tf
-100 700 Td
-(Test Resume PDF) Tj
-ET
-endstream
-endobj
-xref
-0 5
-0000000000 65535 f 
-0000000009 00000 n 
-0000000058 00000 n 
-0000000115 00000 n 
-0000000206 00000 n 
-trailer
-<< /Size 5 /Root 1 0 R >>
-startxref
-290
-%%EOF"""
-            
-            # Create temporary file
-            with tempfile.NamedTemporaryFile(delete=False, suffix='.pdf') as temp_file:
-                temp_file.write(pdf_content)
-                return temp_file.name
-                
-        except Exception as e:
-            print(f"❌ Could not create test PDF: {str(e)}")
-            return None
-
     def test_5_file_storage(self):
         """Test file storage operations"""
-        print("\n5️⃣ Testing file storage...")
+        log.info("\n5️⃣ Testing file storage...")
         try:
             if not self.test_user:
-                print("❌ No authenticated user available")
-                return False
-
-            # Create test PDF
-            test_pdf_path = self.create_test_pdf()
-            if not test_pdf_path:
+                log.error("❌ No authenticated user available")
                 return False
 
             # Upload to master-resumes bucket
             file_path = f"{self.test_user.id}/test-resume.pdf"
 
-            with open(test_pdf_path, 'rb') as file:
-                file_content = file.read()
-
-                # Try to remove existing file first
-                try:
-                    self.supabase.storage.from_('master-resumes').remove([file_path])
-                except:
-                    pass  # File might not exist
-
-                # Upload new file
-                upload_response = self.supabase.storage.from_('master-resumes').upload(
-                    file_path,
-                    file_content,
-                    file_options={"cache-control": "3600", "content-type": "application/pdf"}
-                )
-
-            print("✅ File uploaded to storage!")
-            print(f"   File path: {file_path}")
-
-            # List files in user's folder
-            list_response = self.supabase.storage.from_('master-resumes').list(self.test_user.id)
+            # Upload new file straight from memory; upsert replaces a copy
+            # left by an earlier run, so no remove is needed first
+            upload_response = self.supabase.storage.from_('master-resumes').upload(
+                file_path,
+                TEST_PDF_BYTES,
+                file_options={"cache-control": "3600", "content-type": "application/pdf", "upsert": "true"}
+            )
+
+            log.info("✅ File uploaded to storage!")
+            log.info("   File path: %s", file_path)
+
+            # List files in user's folder and download the file; the two
+            # requests are independent, so their round-trips overlap
+            bucket = self.supabase.storage.from_('master-resumes')
+            with ThreadPoolExecutor(max_workers=2) as pool:
+                list_future = pool.submit(bucket.list, self.test_user.id)
+                download_future = pool.submit(bucket.download, file_path)
+            list_response = list_future.result()
 
             if list_response:
-                print(f"✅ Files listed! Found {len(list_response)} files:")
-                for file_info in list_response:
-                    print(f"   - {file_info['name']} ({file_info['metadata']['size']} bytes)")
+                log.info("✅ Files listed! Found %d files:", len(list_response))
+                if log.isEnabledFor(logging.INFO):
+                    log.info("\n".join(f"   - {file_info['name']} ({file_info['metadata']['size']} bytes)" for file_info in list_response))
 
-            # Download the file
-            download_response = self.supabase.storage.from_('master-resumes').download(file_path)
+            # Downloaded file
+            download_response = download_future.result()
 
             if download_response:
-                print("✅ File downloaded successfully!")
-                print(f"   Downloaded {len(download_response)} bytes")
-
-            # Clean up
-            os.unlink(test_pdf_path)
+                log.info("✅ File downloaded successfully!")
+                log.info("   Downloaded %d bytes", len(download_response))
 
             return True
 
         except Exception as e:
             import traceback
-            print(f"❌ File storage test failed: {str(e)}")
-            print(f"   Traceback: {traceback.format_exc()}")
+            log.error("❌ File storage test failed: %s", e)
+            log.error("   Traceback: %s", traceback.format_exc())
             return False
 
     def test_6_master_resume_database(self):
         """Test master resume database operations"""
-        print("\n6️⃣ Testing master resume database operations...")
+        log.info("\n6️⃣ Testing master resume database operations...")
         try:
             if not self.test_user:
-                print("❌ No authenticated user available")
+                log.error("❌ No authenticated user available")
                 return False
             
             # Insert master resume record
@@ -287,59 +339,35 @@ startxref
                 "file_path": f"{self.test_user.id}/test-resume.pdf",
                 "original_filename": "test-resume.pdf",
                 "file_size": 1024,
-                "structured_data": {
-                    "personal_info": {
-                        "name": "Test User",
-                        "email": "test@example.com",
-                        "phone": "+1234567890"
-                    },
-                    "experience": [
-                        {
-                            "title": "Software Developer",
-                            "company": "Tech Corp",
-                            "duration": "2020-2023",
-                            "description": "Developed web applications"
-                        }
-                    ],
-                    "skills": ["Python", "JavaScript", "React", "SQL"],
-                    "education": [
-                        {
-                            "degree": "Computer Science",
-                            "university": "Tech University",
-                            "year": "2020"
-                        }
-                    ]
-                }
+                "structured_data": MASTER_RESUME_STRUCTURED_DATA
             }
             
+            # PostgREST returns the inserted row, so no separate fetch is needed
             insert_response = self.supabase.table('master_resumes').insert(resume_data).execute()
-            print("✅ Master resume record inserted!")
-            
-            # Fetch master resume
-            fetch_response = self.supabase.table('master_resumes').select('*').eq('user_id', self.test_user.id).execute()
-            
-            if fetch_response.data:
-                resume = fetch_response.data[0]
-                print("✅ Master resume retrieved!")
-                print(f"   File: {resume['original_filename']}")
-                print(f"   Skills: {resume['structured_data']['skills']}")
-                print(f"   Experience: {len(resume['structured_data']['experience'])} entries")
+            log.info("✅ Master resume record inserted!")
+            
+            if insert_response.data:
+                resume = insert_response.data[0]
+                log.info("✅ Master resume retrieved!")
+                log.info("   File: %s", resume['original_filename'])
+                log.info("   Skills: %s", resume['structured_data']['skills'])
+                log.info("   Experience: %d entries", len(resume['structured_data']['experience']))
                 
                 return True
             else:
-                print("❌ Could not retrieve master resume")
+                log.error("❌ Could not retrieve master resume")
                 return False
                 
         except Exception as e:
-            print(f"❌ Master resume database test failed: {str(e)}")
+            log.error("❌ Master resume database test failed: %s", e)
             return False
 
     def test_7_generated_resume_tracking(self):
         """Test generated resume tracking"""
-        print("\n7️⃣ Testing generated resume tracking...")
+        log.info("\n7️⃣ Testing generated resume tracking...")
         try:
             if not self.test_user:
-                print("❌ No authenticated user available")
+                log.error("❌ No authenticated user available")
                 return False
             
             # Insert generated resume record
@@ -350,26 +378,20 @@ startxref
                 "job_description": "We are looking for an experienced Python developer to join our team...",
                 "job_url": "https://careers.google.com/jobs/python-dev",
                 "file_path": f"{self.test_user.id}/google-python-dev.pdf",
-                "modifications_made": {
-                    "emphasized_skills": ["Python", "Machine Learning", "Cloud Computing"],
-                    "reordered_sections": ["experience", "skills", "projects", "education"],
-                    "added_keywords": ["scalable", "distributed systems", "API development"],
-                    "template_used": "modern"
-                },
+                "modifications_made": GENERATED_RESUME_MODIFICATIONS,
                 "template_used": "modern"
             }
             
+            # PostgREST returns the inserted row, so no separate fetch is needed
             insert_response = self.supabase.table('generated_resumes').insert(generated_resume_data).execute()
-            print("✅ Generated resume record inserted!")
-            
-            # Fetch generated resumes
-            fetch_response = self.supabase.table('generated_resumes').select('*').eq('user_id', self.test_user.id).execute()
-            
-            if fetch_response.data:
-                resume = fetch_response.data[0]
-                print("✅ Generated resume retrieved!")
-                print(f"   Job: {resume['job_title']} at {resume['company_name']}")
-                print(f"   Emphasized skills: {resume['modifications_made']['emphasized_skills']}")
+            log.info("✅ Generated resume record inserted!")
+            
+            if insert_response.data:
+                resume = insert_response.data[0]
+                self.generated_resume_id = resume['id']
+                log.info("✅ Generated resume retrieved!")
+                log.info("   Job: %s at %s", resume['job_title'], resume['company_name'])
+                log.info("   Emphasized skills: %s", resume['modifications_made']['emphasized_skills'])
                 
                 # Update with feedback
                 update_data = {
@@ -377,36 +399,29 @@ startxref
                     "got_interview": True
                 }
                 update_response = self.supabase.table('generated_resumes').update(update_data).eq('id', resume['id']).execute()
-                print("✅ Resume feedback updated!")
+                log.info("✅ Resume feedback updated!")
                 
                 return True
             else:
-                print("❌ Could not retrieve generated resume")
+                log.error("❌ Could not retrieve generated resume")
                 return False
                 
         except Exception as e:
-            print(f"❌ Generated resume tracking test failed: {str(e)}")
+            log.error("❌ Generated resume tracking test failed: %s", e)
             return False
 
     def test_8_job_applications_tracking(self):
         """Test job applications tracking"""
-        print("\n8️⃣ Testing job applications tracking...")
+        log.info("\n8️⃣ Testing job applications tracking...")
         try:
             if not self.test_user:
-                print("❌ No authenticated user available")
+                log.error("❌ No authenticated user available")
                 return False
             
-            # Get the generated resume ID for linking
-            generated_resume_response = self.supabase.table('generated_resumes').select('id').eq('user_id', self.test_user.id).limit(1).execute()
-            
-            generated_resume_id = None
-            if generated_resume_response.data:
-                generated_resume_id = generated_resume_response.data[0]['id']
-            
-            # Insert job application record
+            # Insert job application record, linked to the resume from test 7
             job_app_data = {
                 "user_id": self.test_user.id,
-                "generated_resume_id": generated_resume_id,
+                "generated_resume_id": self.generated_resume_id,
                 "job_url": "https://careers.google.com/jobs/python-dev",
                 "company_name": "Google",
                 "job_title": "Senior Python Developer",
@@ -414,154 +429,173 @@ startxref
                 "keywords_matched": ["Python", "API", "Cloud", "Machine Learning"]
             }
             
+            # PostgREST returns the inserted row, so no separate fetch is needed
             insert_response = self.supabase.table('job_applications').insert(job_app_data).execute()
-            print("✅ Job application record inserted!")
-            
-            # Fetch job applications
-            fetch_response = self.supabase.table('job_applications').select('*').eq('user_id', self.test_user.id).execute()
-            
-            if fetch_response.data:
-                job_app = fetch_response.data[0]
-                print("✅ Job application retrieved!")
-                print(f"   Position: {job_app['job_title']} at {job_app['company_name']}")
-                print(f"   Status: {job_app['status']}")
-                print(f"   Keywords matched: {job_app['keywords_matched']}")
+            log.info("✅ Job application record inserted!")
+            
+            if insert_response.data:
+                job_app = insert_response.data[0]
+                log.info("✅ Job application retrieved!")
+                log.info("   Position: %s at %s", job_app['job_title'], job_app['company_name'])
+                log.info("   Status: %s", job_app['status'])
+                log.info("   Keywords matched: %s", job_app['keywords_matched'])
                 
                 return True
             else:
-                print("❌ Could not retrieve job application")
+                log.error("❌ Could not retrieve job application")
                 return False
                 
         except Exception as e:
-            print(f"❌ Job applications tracking test failed: {str(e)}")
+            log.error("❌ Job applications tracking test failed: %s", e)
             return False
 
     def test_9_analytics_queries(self):
         """Test analytics and reporting queries"""
-        print("\n9️⃣ Testing analytics queries...")
+        log.info("\n9️⃣ Testing analytics queries...")
         try:
             if not self.test_user:
-                print("❌ No authenticated user available")
+                log.error("❌ No authenticated user available")
                 return False
             
-            # Get user's resume statistics
-            generated_count_response = self.supabase.table('generated_resumes').select('id', count='exact').eq('user_id', self.test_user.id).execute()
-            generated_count = generated_count_response.count
-            
-            applications_count_response = self.supabase.table('job_applications').select('id', count='exact').eq('user_id', self.test_user.id).execute()
-            applications_count = applications_count_response.count
-            
-            # Get success rate
-            interview_response = self.supabase.table('generated_resumes').select('got_interview').eq('user_id', self.test_user.id).execute()
-            interviews = sum(1 for resume in interview_response.data if resume.get('got_interview'))
-            
-            print("✅ Analytics computed successfully!")
-            print(f"   Generated resumes: {generated_count}")
-            print(f"   Job applications: {applications_count}")
-            print(f"   Interviews secured: {interviews}")
+            # Get user's resume statistics and success rate; Postgres does the
+            # counting, interviews included, and the queries run concurrently
+            queries = [
+                self.supabase.table('generated_resumes').select('id', count='exact').eq('user_id', self.test_user.id),
+                self.supabase.table('generated_resumes').select('id', count='exact').eq('user_id', self.test_user.id).eq('got_interview', True),
+                self.supabase.table('job_applications').select('id', count='exact').eq('user_id', self.test_user.id)
+            ]
+            with ThreadPoolExecutor(max_workers=len(queries)) as pool:
+                generated_count, interviews, applications_count = pool.map(lambda query: query.execute().count, queries)
+            
+            log.info("✅ Analytics computed successfully!")
+            log.info("   Generated resumes: %s", generated_count)
+            log.info("   Job applications: %s", applications_count)
+            log.info("   Interviews secured: %s", interviews)
             if generated_count > 0:
-                print(f"   Success rate: {(interviews/generated_count)*100:.1f}%")
+                log.info("   Success rate: %.1f%%", (interviews/generated_count)*100)
             
             return True
             
         except Exception as e:
-            print(f"❌ Analytics queries test failed: {str(e)}")
+            log.error("❌ Analytics queries test failed: %s", e)
             return False
 
     def cleanup(self):
         """Clean up test data"""
-        print("\n🧹 Cleaning up test data...")
+        log.info("\n🧹 Cleaning up test data...")
         try:
             if not self.test_user:
-                print("⚠️ No test user to clean up")
+                log.warning("⚠️ No test user to clean up")
                 return
             
-            # Delete in reverse order due to foreign key constraints
-            self.supabase.table('job_applications').delete().eq('user_id', self.test_user.id).execute()
-            self.supabase.table('generated_resumes').delete().eq('user_id', self.test_user.id).execute()
-            self.supabase.table('master_resumes').delete().eq('user_id', self.test_user.id).execute()
-            self.supabase.table('user_preferences').delete().eq('user_id', self.test_user.id).execute()
-            self.supabase.table('user_profiles').delete().eq('id', self.test_user.id).execute()
+            user_id = self.test_user.id
+            
+            def delete_resumes():
+                # Applications reference generated resumes, so they go first
+                self.supabase.table('job_applications').delete().eq('user_id', user_id).execute()
+                self.supabase.table('generated_resumes').delete().eq('user_id', user_id).execute()
             
-            # Delete files from storage
-            try:
-                self.supabase.storage.from_('master-resumes').remove([f"{self.test_user.id}/test-resume.pdf"])
-            except:
-                pass  # File might not exist
+            def delete_files():
+                try:
+                    self.supabase.storage.from_('master-resumes').remove([f"{user_id}/test-resume.pdf"])
+                except:
+                    pass  # File might not exist
             
-            print("✅ Test data cleaned up!")
+            # Rows that don't reference each other are deleted concurrently;
+            # the profile goes last, once nothing else refers to it
+            with ThreadPoolExecutor(max_workers=4) as pool:
+                deletions = [
+                    pool.submit(delete_resumes),
+                    pool.submit(self.supabase.table('master_resumes').delete().eq('user_id', user_id).execute),
+                    pool.submit(self.supabase.table('user_preferences').delete().eq('user_id', user_id).execute),
+                    pool.submit(delete_files)
+                ]
+            for deletion in deletions:
+                deletion.result()
+            self.supabase.table('user_profiles').delete().eq('id', user_id).execute()
+            
+            log.info("✅ Test data cleaned up!")
             
         except Exception as e:
-            print(f"⚠️ Cleanup warning: {str(e)}")
+            log.warning("⚠️ Cleanup warning: %s", e)
+
+    def _run_test(self, test) -> bool:
+        """Run one test, counting an uncaught exception as a failure"""
+        try:
+            return bool(test())
+        except Exception as e:
+            log.error("❌ Test %s failed with exception: %s", test.__name__, e)
+            return False
 
     def run_all_tests(self):
         """Run all tests in sequence"""
-        print("🧪 SUPABASE DATABASE TEST SUITE")
-        print("=" * 60)
+        log.info("🧪 SUPABASE DATABASE TEST SUITE")
+        log.info("=" * 60)
         
-        tests = [
-            self.test_1_connection,
-            self.test_2_user_registration,
-            self.test_3_user_login,
-            self.test_4_user_preferences,
-            self.test_5_file_storage,
-            self.test_6_master_resume_database,
-            self.test_7_generated_resume_tracking,
-            self.test_8_job_applications_tracking,
-            self.test_9_analytics_queries
+        # Stages run in order; tests within a stage only need the logged-in
+        # user, not each other's rows, so they run concurrently
+        stages = [
+            [self.test_1_connection],
+            [self.test_2_user_registration],
+            [self.test_3_user_login],
+            [self.test_4_user_preferences, self.test_5_file_storage, self.test_6_master_resume_database],
+            [self.test_7_generated_resume_tracking],
+            [self.test_8_job_applications_tracking],
+            [self.test_9_analytics_queries]
         ]
         
         passed = 0
         failed = 0
         
-        for test in tests:
-            try:
-                if test():
-                    passed += 1
-                else:
-                    failed += 1
-            except Exception as e:
-                print(f"❌ Test {test.__name__} failed with exception: {str(e)}")
-                failed += 1
+        for stage in stages:
+            if len(stage) == 1:
+                results = [self._run_test(stage[0])]
+            else:
+                with ThreadPoolExecutor(max_workers=len(stage)) as pool:
+                    results = list(pool.map(self._run_test, stage))
+            passed += sum(results)
+            failed += len(results) - sum(results)
         
         # Cleanup
         self.cleanup()
         
         # Summary
-        print("\n" + "=" * 60)
-        print("📊 TEST SUMMARY")
-        print("=" * 60)
-        print(f"✅ Passed: {passed}")
-        print(f"❌ Failed: {failed}")
-        print(f"📈 Success Rate: {(passed/(passed+failed)*100):.1f}%")
+        log.info("\n" + "=" * 60)
+        log.info("📊 TEST SUMMARY")
+        log.info("=" * 60)
+        log.info("✅ Passed: %s", passed)
+        log.info("❌ Failed: %s", failed)
+        log.info("📈 Success Rate: %.1f%%", (passed/(passed+failed)*100))
         
         if failed == 0:
-            print("\n🎉 ALL TESTS PASSED! Your Supabase setup is working perfectly!")
+            log.info("\n🎉 ALL TESTS PASSED! Your Supabase setup is working perfectly!")
         else:
-            print(f"\n⚠️ {failed} tests failed. Please check the error messages above.")
+            log.warning("\n⚠️ %s tests failed. Please check the error messages above.", failed)
         
         return failed == 0
 
 
 def main():
     """Main function to run the test suite"""
-    print("Setting up test environment...")
+    # Plain messages, as the suite used to print them; LOG_LEVEL=WARNING
+    # shows only problems
+    logging.basicConfig(level=os.getenv('LOG_LEVEL', 'INFO').upper(), format='%(message)s')
+    log.info("Setting up test environment...")
     
     # Check if .env file exists
     if not os.path.exists('.env'):
-        print("\n❌ .env file not found!")
-        print("Please create a .env file with:")
-        print("SUPABASE_URL=your_supabase_url")
-        print("SUPABASE_ANON_KEY=your_anon_key")
+        log.error("\n❌ .env file not found!")
+        log.info("Please create a .env file with:")
+        log.info("SUPABASE_URL=your_supabase_url")
+        log.info("SUPABASE_ANON_KEY=your_anon_key")
         return
     
     try:
-        print("test suite")
         test_suite = SupabaseTestSuite()
         test_suite.run_all_tests()
     except Exception as e:
-        print(f"❌ Failed to initialize test suite: {str(e)}")
-        print("\nPlease check your environment variables and Supabase setup.")
+        log.error("❌ Failed to initialize test suite: %s", e)
+        log.info("\nPlease check your environment variables and Supabase setup.")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,155 @@
+import pytest
+
+from app.agents.latex_rendercv import latex_to_rendercv
+
+HEADER = r"""
+\begin{center}
+    \textbf{\Huge \scshape Jane Doe} \\ \vspace{1pt}
+    \small +1 555 123 4567 $|$ \href{mailto:jane@example.com}{\underline{jane@example.com}} $|$
+    \href{https://linkedin.com/in/janedoe}{\underline{linkedin.com/in/janedoe}} $|$
+    \href{https://github.com/janedoe}{\underline{github.com/janedoe}}
+\end{center}
+"""
+
+
+def _resume(body: str, header: str = HEADER) -> str:
+    return "\\documentclass{article}\n\\begin{document}\n" + header + body + "\n\\end{document}\n"
+
+
+def test_header_and_sections():
+    latex = _resume(r"""
+\section{Education}
+  \resumeSubHeadingListStart
+    \resumeSubheading
+      {State University}{Springfield, IL}
+      {Bachelor of Science in Computer Science}{Aug. 2018 -- May 2022}
+  \resumeSubHeadingListEnd
+
+\section{Experience}
+  \resumeSubHeadingListStart
+    \resumeSubheading
+      {Software Engineer}{June 2022 -- Present}
+      {Acme Corp}{Remote}
+      \resumeItemListStart
+        \resumeItem{Built the \textbf{billing} service}
+        \resumeItem{Cut p99 latency by 40\%}
+      \resumeItemListEnd
+  \resumeSubHeadingListEnd
+
+\section{Projects}
+  \resumeSubHeadingListStart
+    \resumeProjectHeading
+      {\textbf{Gitlytics} $|$ \emph{Python, Flask}}{June 2020}
+  \resumeSubHeadingListEnd
+
+\section{Technical Skills}
+ \begin{itemize}[leftmargin=0.15in, label={}]
+    \small{\item{
+     \textbf{Languages}{: Python, C\#, SQL} \\
+     \textbf{Tools}{: Git, Docker}
+    }}
+ \end{itemize}
+""")
+
+    assert latex_to_rendercv(latex) == {
+        "cv": {
+            "name": "Jane Doe",
+            "phone": "+1 555 123 4567",
+            "email": "jane@example.com",
+            "social_networks": [
+                {"network": "LinkedIn", "username": "janedoe"},
+                {"network": "GitHub", "username": "janedoe"},
+            ],
+            "sections": {
+                "Education": [{
+                    "institution": "State University",
+                    "area": "Bachelor of Science in Computer Science",
+                    "location": "Springfield, IL",
+                    "date": "Aug. 2018 \u2013 May 2022",
+                }],
+                "Experience": [{
+                    "company": "Acme Corp",
+                    "position": "Software Engineer",
+                    "location": "Remote",
+                    "date": "June 2022 \u2013 Present",
+                    "highlights": ["Built the **billing** service", "Cut p99 latency by 40%"],
+                }],
+                "Projects": [{"name": "**Gitlytics** | *Python, Flask*", "date": "June 2020"}],
+                "Technical Skills": [
+                    {"label": "Languages", "details": "Python, C#, SQL"},
+                    {"label": "Tools", "details": "Git, Docker"},
+                ],
+            },
+        },
+        "design": {"theme": "sb2nov"},
+    }
+
+
+def test_escapes_links_and_comments():
+    latex = _resume(r"""
+% \section{Commented Out}
+\section{Highlights}
+  \resumeItemListStart
+    \resumeItem{R\&D at 50\% of \$1M, see \href{https://example.com}{site} % trailing comment
+    }
+    \resumeItem{Used snake\_case and \{braces\}}
+  \resumeItemListEnd
+""")
+
+    assert latex_to_rendercv(latex)["cv"]["sections"] == {
+        "Highlights": [
+            {"bullet": "R&D at 50% of $1M, see [site](https://example.com)"},
+            {"bullet": "Used snake_case and {braces}"},
+        ],
+    }
+
+
+def test_empty_sections_are_dropped():
+    latex = _resume(r"""
+\section{Awards}
+  \resumeSubHeadingListStart
+  \resumeSubHeadingListEnd
+\section{Projects}
+  \resumeSubHeadingListStart
+    \resumeProjectHeading{Compiler}{2021}
+  \resumeSubHeadingListEnd
+""")
+
+    assert latex_to_rendercv(latex)["cv"]["sections"] == {
+        "Projects": [{"name": "Compiler", "date": "2021"}],
+    }
+
+
+def test_sub_subheading_keeps_company():
+    latex = _resume(r"""
+\section{Experience}
+  \resumeSubheading{Engineer II}{2023 -- Present}{Acme Corp}{Remote}
+  \resumeSubSubheading{Engineer I}{2021 -- 2023}
+""")
+
+    assert latex_to_rendercv(latex)["cv"]["sections"]["Experience"] == [
+        {"company": "Acme Corp", "position": "Engineer II", "location": "Remote", "date": "2023 \u2013 Present"},
+        {"company": "Acme Corp", "position": "Engineer I", "date": "2021 \u2013 2023"},
+    ]
+
+
+@pytest.mark.parametrize("latex", [
+    pytest.param(r"\section{Projects}", id="no-document"),
+    pytest.param(_resume(""), id="no-sections"),
+    pytest.param(_resume(r"\section{Projects}\resumeProjectHeading{A}{2020}", header=r"\textbf{Jane}"),
+                 id="no-name"),
+    pytest.param(_resume(r"\section{Projects}\resumeProjectHeading{A}{2020}",
+                         header=r"{\Huge Jane Doe} \\ 555 123 4567"),
+                 id="phone-without-country-code"),
+    pytest.param(_resume(r"\section{Projects}\customEntry{A}"), id="unknown-macro"),
+    pytest.param(_resume(r"\section{Projects}\resumeProjectHeading{A}{2020} stray text"), id="stray-text"),
+    pytest.param(_resume(r"\section{Projects}\resumeProjectHeading{$O(n)$ sort}{2020}"), id="math"),
+    pytest.param(_resume(r"\section{Projects}\resumeItem{Title}{Text}"), id="two-argument-item"),
+    pytest.param(_resume(r"\section{Misc}\resumeItem{A}\resumeProjectHeading{B}{2020}"), id="mixed-entries"),
+    pytest.param(_resume(r"\section{Projects}\resumeProjectHeading{A}{2020}"
+                         r"\section{Projects}\resumeProjectHeading{B}{2021}"),
+                 id="duplicate-section"),
+    pytest.param(_resume(r"\section{Projects}\resumeProjectHeading{A{2020}"), id="unbalanced-braces"),
+])
+def test_unsupported_latex_returns_none(latex):
+    assert latex_to_rendercv(latex) is None